@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, update
+
+from website import db, db_manager
+
+PASSWORD = "benchmark"
+
+
+class FarmSize:
+    def __init__(
+        self,
+        rooms: int = 5,
+        trays: int = 10,
+        lights: int = 4,
+        width: int = 3,
+        height: int = 3,
+        strains: int = 20,
+        users: int = 25,
+    ) -> None:
+        self.rooms = rooms
+        self.trays = trays
+        self.lights = lights
+        self.width = width
+        self.height = height
+        self.strains = strains
+        self.users = users
+
+    @property
+    def pots(self) -> int:
+        return self.rooms * self.trays * self.lights * self.width * self.height
+
+    def to_dict(self) -> dict:
+        return dict(vars(self), pots=self.pots)
+
+
+class Farm:
+    def __init__(self, size: FarmSize, room_ids: list[int], tray_ids: list[int]):
+        self.size = size
+        self.room_ids = room_ids
+        self.tray_ids = tray_ids
+        # Room created untimed before each delete_room round.
+        self.spare_room_id: int | None = None
+
+
+def build_farm(size: FarmSize) -> Farm:
+    """Populate the current database with a synthetic farm.
+
+    Users, rooms and trays go through DatabaseManager so they are created the
+    way the app creates them; strains are then spread round-robin over every
+    pot and half of the trays are marked as planted.
+    """
+    from website.models import Pot, Strain, Tray
+
+    db_manager.create_user(
+        "Admin", "admin@hubsync.com", "admin", PASSWORD, "superadmin"
+    )
+    for i in range(size.users):
+        role = "admin" if i % 5 == 0 else "member"
+        db_manager.create_user(
+            f"Member {i}", f"member{i}@hubsync.com", f"member{i}", PASSWORD, role
+        )
+
+    room_ids, tray_ids = [], []
+    for r in range(size.rooms):
+        room_id = db_manager.create_room(f"ROOM {r}").id
+        room_ids.append(room_id)
+        for t in range(size.trays):
+            response = db_manager.add_tray_to_room(
+                room_id, f"TRAY {t}", size.lights, size.width, size.height
+            )
+            tray_ids.append(response.id)
+
+    if size.strains:
+        strain_ids = db.session.scalars(
+            insert(Strain).returning(Strain.id, sort_by_parameter_order=True),
+            [{"name": f"Strain {i}"} for i in range(size.strains)],
+        ).all()
+        db.session.execute(
+            update(Pot).values(strain_id=strain_ids[0] + Pot.id % len(strain_ids))
+        )
+
+    now = datetime.now()
+    db.session.execute(
+        update(Tray)
+        .where(Tray.id % 2 == 0)
+        .values(
+            planted_date=now - timedelta(days=30), harvest_date=now + timedelta(days=60)
+        )
+    )
+    db.session.execute(update(Tray).values(version=db_manager.next_tray_version()))
+    db.session.commit()
+    return Farm(size, room_ids, tray_ids)
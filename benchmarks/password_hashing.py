@@ -0,0 +1,35 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from website.utils.hashing import PasswordHasher
+
+METHODS = [
+    "pbkdf2:sha256:100000",
+    "pbkdf2:sha256:600000",
+    "scrypt:16384:8:1",
+    "scrypt:32768:8:1",
+]
+CLIENTS = 8
+LOGINS = 32
+
+
+def measure(method: str, workers: int) -> float:
+    hasher = PasswordHasher(method=method, workers=workers, max_queue=LOGINS)
+    pwhash = hasher.hash("password")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(CLIENTS) as clients:
+        list(clients.map(lambda _: hasher.verify(pwhash, "password"), range(LOGINS)))
+    return LOGINS / (time.perf_counter() - start)
+
+
+def main() -> None:
+    print(f"{LOGINS} logins from {CLIENTS} concurrent clients")
+    for method in METHODS:
+        for workers in (1, 2, 4):
+            rate = measure(method, workers)
+            print(f"{method:<24} workers={workers}: {rate:7.1f} logins/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Fail when rendering a room runs more queries as the room grows.
+
+    python -m benchmarks.query_counts
+
+Renders the same room with TRAYS and then twice as many trays, with a cold
+fragment cache each time, and exits with status 1 when the second render
+runs more SQL statements than the first.
+"""
+
+import os
+import sys
+import tempfile
+
+fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+os.close(fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["MAIL_DISPATCHER"] = "0"
+os.environ["TOKEN_SWEEPER"] = "0"
+
+from flask.testing import FlaskClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from website import create_app, db, db_manager
+from website.fragments import fragment_cache
+
+TRAYS = 5
+
+
+def count_queries(engine: Engine, client: FlaskClient, path: str) -> int:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    fragment_cache.cache.clear()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 200, response.status_code
+    return len(statements)
+
+
+def main() -> int:
+    app = create_app()
+    with app.app_context():
+        db_manager.create_user(
+            "Admin", "admin@hubsync.com", "admin", "pw", "superadmin"
+        )
+        db_manager.create_room("BENCHMARK")
+        engine = db.engine
+
+    client = app.test_client()
+    client.post("/login", data={"email_or_username": "admin", "password": "pw"})
+
+    sizes = (TRAYS, TRAYS * 2)
+    counts = []
+    for start, total in zip((0,) + sizes, sizes):
+        with app.app_context():
+            for i in range(start, total):
+                db_manager.add_tray_to_room(1, f"TRAY {i}", 4, 3, 3)
+        count_queries(engine, client, "/layouts/1")
+        counts.append(count_queries(engine, client, "/layouts/1"))
+
+    os.remove(DB_PATH)
+    for total, count in zip(sizes, counts):
+        print(f"Room with {total} trays: {count} queries")
+    if counts[1] > counts[0]:
+        print("Query count grows with the number of trays")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Fail when a DatabaseManager query scans a table it should look up.
+
+    python -m benchmarks.query_plans
+
+Runs the main DatabaseManager operations against an in-memory database and
+asks SQLite for the plan of every statement. Any ``SCAN`` of a table that is
+not in ``ALLOWED_SCANS`` exits with status 1, including ``SCAN ... USING
+INDEX``, which still reads the whole index.
+"""
+
+import re
+import sys
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from website import db, db_manager
+from website.models import User
+
+# Tables whose listing queries are meant to read every row.
+ALLOWED_SCANS = {"rooms", "users"}
+ALIAS = re.compile(r"\b(?:FROM|JOIN|UPDATE)\s+(\w+)(?:\s+AS\s+(\w+))?", re.IGNORECASE)
+
+
+def scanned_table(detail: str, statement: str) -> str | None:
+    """Return the table a ``SCAN`` plan step reads, resolving aliases."""
+    if not detail.startswith("SCAN "):
+        return None
+    name = detail.split()[1]
+    for table, alias in ALIAS.findall(statement):
+        if name in (table, alias):
+            return table
+    return None
+
+
+class QueryPlanRecorder:
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.statements: list[tuple[str, tuple]] = []
+
+    def __enter__(self) -> "QueryPlanRecorder":
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            params = parameters[0] if executemany else parameters
+            self.statements.append((statement, params))
+
+    def table_scans(self) -> list[tuple[str, str]]:
+        scans = []
+        with self.engine.connect() as conn:
+            for statement, params in self.statements:
+                plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params)
+                for row in plan:
+                    detail = row[-1]
+                    table = scanned_table(detail, statement)
+                    if table in db.metadata.tables and table not in ALLOWED_SCANS:
+                        scans.append((detail, statement))
+        return scans
+
+
+def exercise(app: Flask) -> None:
+    with app.app_context():
+        db_manager.create_user(
+            "Admin", "admin@hubsync.com", "admin", "pw", "superadmin"
+        )
+        db_manager.create_user("Member", "member@hubsync.com", "member", "pw", "member")
+        db_manager.has_users()
+        db_manager.get_cached_user(1)
+        member = db_manager.get_user_by_username("member")
+        assert member is not None
+        token = db_manager.generate_reset_password_token(member)
+        db_manager.verify_reset_password_token(token)
+        db_manager.purge_reset_tokens()
+        db_manager.update_user_profile(member.id, "Member", "m@hubsync.com", "member")
+        db_manager.reset_password("new", "m@hubsync.com")
+        db_manager.change_password("new", "newer", "m@hubsync.com")
+
+        db_manager.create_room("ROOM")
+        db_manager.update_room_name(1, "RENAMED")
+        db_manager.add_tray_to_room(1, "TRAY", 4, 3, 3)
+        db_manager.get_room_layout(1)
+        db_manager.get_room_summaries()
+        db_manager.edit_tray(1, "TRAY", 3, 2, 4)
+        db_manager.assign_strain(1, "KUSH")
+        db_manager.assign_strain(1, "HAZE", tray_id=1, pot_ids=[1, 2])
+        db_manager.assign_strain(1, "HAZE", tray_id=1, region=(0, 0, 1, 1))
+        db_manager.import_facility(
+            [
+                {"room": "IMPORTED", "tray": None, "strains": []},
+                {
+                    "room": "IMPORTED",
+                    "tray": "TRAY",
+                    "lights": 1,
+                    "width": 1,
+                    "height": 2,
+                    "planted_date": None,
+                    "harvest_date": None,
+                    "strains": ["KUSH", None],
+                },
+            ]
+        )
+        list(db_manager.iter_facility())
+        db_manager.delete_tray(1)
+        db_manager.add_tray_to_room(1, "TRAY", 2, 2, 2)
+        db_manager.delete_room(1)
+        db_manager.delete_user(member.id)
+        User.query.all()
+
+
+def main() -> int:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    db_manager.create_tables(app)
+
+    with app.app_context():
+        recorder = QueryPlanRecorder(db.engine)
+    with recorder:
+        exercise(app)
+
+    with app.app_context():
+        scans = recorder.table_scans()
+    print(f"Checked {len(recorder.statements)} statements")
+    for detail, statement in scans:
+        print(f"{detail}: {' '.join(statement.split())}")
+    return 1 if scans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import time
+
+fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+os.close(fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["MAIL_DISPATCHER"] = "0"
+os.environ["TOKEN_SWEEPER"] = "0"
+
+from website import create_app, db_manager
+from website.fragments import fragment_cache
+
+TRAYS = 50
+ROUNDS = 20
+
+
+def main() -> None:
+    app = create_app()
+    with app.app_context():
+        db_manager.create_user(
+            "Admin", "admin@hubsync.com", "admin", "pw", "superadmin"
+        )
+        db_manager.create_room("BENCHMARK")
+        for i in range(TRAYS):
+            db_manager.add_tray_to_room(1, f"TRAY {i}", 4, 3, 3)
+
+    client = app.test_client()
+    client.post("/login", data={"email_or_username": "admin", "password": "pw"})
+
+    cold, warm = [], []
+    for _ in range(ROUNDS):
+        fragment_cache.cache.clear()
+        start = time.perf_counter()
+        client.get("/layouts/1")
+        cold.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        client.get("/layouts/1")
+        warm.append(time.perf_counter() - start)
+
+    os.remove(DB_PATH)
+    print(f"Room with {TRAYS} trays, best of {ROUNDS}")
+    print(f"Cold fragment cache: {min(cold) * 1000:.1f} ms")
+    print(f"Warm fragment cache: {min(warm) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+from website.config import SQLITE_PRAGMAS
+from website.database import sqlite_pragma_listener
+
+MODES = {
+    "default": {},
+    "tuned": SQLITE_PRAGMAS,
+}
+WRITERS = 4
+READERS = 8
+DURATION = 3
+
+
+def run_mode(pragmas: dict) -> dict[str, int]:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", pool_size=WRITERS + READERS)
+    if pragmas:
+        event.listen(engine, "connect", sqlite_pragma_listener(pragmas))
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE pots (id INTEGER PRIMARY KEY, strain INT)"))
+        conn.execute(
+            text("INSERT INTO pots (strain) VALUES (:strain)"),
+            [{"strain": i} for i in range(1000)],
+        )
+
+    deadline = time.perf_counter() + DURATION
+
+    def writer(_) -> tuple[int, int]:
+        done = locked = 0
+        while time.perf_counter() < deadline:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text("UPDATE pots SET strain = strain + 1 WHERE id < 50")
+                    )
+                done += 1
+            except OperationalError:
+                locked += 1
+        return done, locked
+
+    def reader(_) -> tuple[int, int]:
+        done = locked = 0
+        while time.perf_counter() < deadline:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT sum(strain) FROM pots")).scalar()
+                done += 1
+            except OperationalError:
+                locked += 1
+        return done, locked
+
+    with ThreadPoolExecutor(WRITERS + READERS) as pool:
+        write_futures = [pool.submit(writer, i) for i in range(WRITERS)]
+        read_futures = [pool.submit(reader, i) for i in range(READERS)]
+        writes = [future.result() for future in write_futures]
+        reads = [future.result() for future in read_futures]
+
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    return {
+        "writes": sum(done for done, _ in writes),
+        "reads": sum(done for done, _ in reads),
+        "locked": sum(locked for _, locked in writes + reads),
+    }
+
+
+def main() -> None:
+    print(f"{WRITERS} writers, {READERS} readers, {DURATION}s per mode")
+    for name, pragmas in MODES.items():
+        result = run_mode(pragmas)
+        print(
+            f"{name:<8} writes/s={result['writes'] / DURATION:8.1f} "
+            f"reads/s={result['reads'] / DURATION:8.1f} "
+            f"locked errors={result['locked']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
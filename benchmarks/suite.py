@@ -0,0 +1,272 @@
+"""Time the main operations against a synthetic farm.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --compare results.json --threshold 0.2
+
+Exits with status 1 when --compare finds an operation whose median got
+slower than the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable
+
+fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+os.close(fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["MAIL_DISPATCHER"] = "0"
+os.environ["TOKEN_SWEEPER"] = "0"
+
+from flask import Flask
+from flask.testing import FlaskClient
+from werkzeug.test import TestResponse
+
+from benchmarks.farm import PASSWORD, Farm, FarmSize, build_farm
+from website import create_app, db_manager
+from website.fragments import fragment_cache
+
+
+class Benchmark:
+    """One timed operation; ``setup`` runs before each round, untimed."""
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[FlaskClient, Farm, int], None],
+        setup: Callable[[Farm, int], None] | None = None,
+    ) -> None:
+        self.name = name
+        self.run = run
+        self.setup = setup
+
+
+def expect(response: TestResponse, status: int = 200) -> None:
+    # A benchmark that times an error page would report a bogus speedup.
+    assert response.status_code == status, f"{response.request.path}: {response.status}"
+
+
+def login(client: FlaskClient, username: str = "admin") -> None:
+    expect(
+        client.post(
+            "/login", data={"email_or_username": username, "password": PASSWORD}
+        ),
+        302,
+    )
+
+
+def render_room(client: FlaskClient, farm: Farm, i: int) -> None:
+    expect(client.get(f"/layouts/{farm.room_ids[i % len(farm.room_ids)]}"))
+
+
+def render_room_cold(client: FlaskClient, farm: Farm, i: int) -> None:
+    fragment_cache.cache.clear()
+    render_room(client, farm, i)
+
+
+def render_layouts(client: FlaskClient, farm: Farm, i: int) -> None:
+    expect(client.get("/layouts"))
+
+
+def list_staff(client: FlaskClient, farm: Farm, i: int) -> None:
+    expect(client.get("/staff"))
+
+
+def log_in(client: FlaskClient, farm: Farm, i: int) -> None:
+    login(client.application.test_client(), f"member{i % farm.size.users}")
+
+
+def add_tray(client: FlaskClient, farm: Farm, i: int) -> None:
+    size = farm.size
+    response = client.post(
+        f"/layouts/{farm.room_ids[0]}/add_tray",
+        data={
+            "name": f"BENCHMARK {i}",
+            "num_of_lights": size.lights,
+            "width": size.width,
+            "height": size.height,
+        },
+    )
+    expect(response, 302)
+
+
+def edit_tray(client: FlaskClient, farm: Farm, i: int) -> None:
+    # Alternate between two sizes so every round really resizes the tray.
+    size = farm.size
+    response = client.post(
+        f"/layouts/{farm.room_ids[0]}/edit_tray/{farm.tray_ids[0]}",
+        data={
+            "name": f"EDITED {i}",
+            "num_of_lights": size.lights + i % 2,
+            "width": size.width + i % 2,
+            "height": size.height,
+        },
+    )
+    expect(response, 302)
+
+
+def create_spare_room(farm: Farm, i: int) -> None:
+    size = farm.size
+    room_id = db_manager.create_room(f"SPARE {i}").id
+    for t in range(size.trays):
+        db_manager.add_tray_to_room(
+            room_id, f"TRAY {t}", size.lights, size.width, size.height
+        )
+    farm.spare_room_id = room_id
+
+
+def delete_room(client: FlaskClient, farm: Farm, i: int) -> None:
+    expect(client.post(f"/layouts/delete/{farm.spare_room_id}"), 302)
+
+
+# Read-only operations first, so the mutations don't change what they see.
+BENCHMARKS = [
+    Benchmark("room_render", render_room),
+    Benchmark("room_render_cold_cache", render_room_cold),
+    Benchmark("layouts_render", render_layouts),
+    Benchmark("staff_listing", list_staff),
+    Benchmark("login", log_in),
+    Benchmark("add_tray_to_room", add_tray),
+    Benchmark("edit_tray", edit_tray),
+    Benchmark("delete_room", delete_room, create_spare_room),
+]
+
+
+def measure(
+    app: Flask, client: FlaskClient, farm: Farm, benchmark: Benchmark, rounds: int
+) -> dict:
+    timings = []
+    # The first round warms caches and lazy imports and is not recorded.
+    for i in range(rounds + 1):
+        if benchmark.setup:
+            with app.app_context():
+                benchmark.setup(farm, i)
+        start = time.perf_counter()
+        benchmark.run(client, farm, i)
+        elapsed = time.perf_counter() - start
+        if i:
+            timings.append(elapsed * 1000)
+        # Redirects aren't followed, so drop the flashes they would have shown
+        # before they pile up in the session cookie.
+        with client.session_transaction() as session:
+            session.pop("_flashes", None)
+
+    return {
+        "rounds": rounds,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(size: FarmSize, rounds: int, only: list[str] | None) -> dict:
+    app = create_app()
+    with app.app_context():
+        farm = build_farm(size)
+
+    client = app.test_client()
+    login(client)
+
+    results = {}
+    for benchmark in BENCHMARKS:
+        if only and benchmark.name not in only:
+            continue
+        results[benchmark.name] = measure(app, client, farm, benchmark, rounds)
+        print(f"{benchmark.name:<24} {results[benchmark.name]['median_ms']:>9.2f} ms")
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "farm": size.to_dict(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print a comparison table and return the names of regressed operations."""
+    if current["farm"] != baseline["farm"]:
+        print("Warning: farm sizes differ from the baseline, timings may not compare")
+
+    regressions = []
+    print(f"\n{'operation':<24} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<24} {'-':>10} {result['median_ms']:>10.2f} {'new':>8}")
+            continue
+
+        change = result["median_ms"] / base["median_ms"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<24} {base['median_ms']:>10.2f} {result['median_ms']:>10.2f}"
+            f" {change:>+8.0%}{flag}"
+        )
+    return regressions
+
+
+def main() -> None:
+    defaults = FarmSize()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for name, default in vars(defaults).items():
+        parser.add_argument(f"--{name}", type=int, default=default)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--only", nargs="+", choices=[b.name for b in BENCHMARKS])
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative median slowdown reported as a regression (default 0.2)",
+    )
+    args = parser.parse_args()
+
+    size = FarmSize(**{name: getattr(args, name) for name in vars(defaults)})
+    print(f"Farm: {size.to_dict()}, {args.rounds} rounds\n")
+    try:
+        current = run(size, args.rounds, args.only)
+    finally:
+        os.remove(DB_PATH)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import time
+
+from flask import Flask
+
+from website import db, db_manager
+
+NUM_OF_LIGHTS = 8
+WIDTH = 10
+HEIGHT = 10
+ROUNDS = 5
+
+
+def create_benchmark_app() -> Flask:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    db_manager.create_tables(app)
+    return app
+
+
+def create_tray_orm(room_id: int) -> None:
+    from website.models import Light, Pot, Tray
+
+    tray = Tray(room_id, "ORM")
+    tray.lights = [
+        Light(0, WIDTH, HEIGHT, [Pot(0, i) for i in range(WIDTH * HEIGHT)])
+        for _ in range(NUM_OF_LIGHTS)
+    ]
+    db.session.add(tray)
+    db.session.commit()
+
+
+def create_tray_bulk(room_id: int) -> None:
+    db_manager.create_tray(room_id, "BULK", NUM_OF_LIGHTS, WIDTH, HEIGHT)
+    db.session.commit()
+
+
+def measure(fn, room_id: int) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn(room_id)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    from website.models import Room
+
+    app = create_benchmark_app()
+    with app.app_context():
+        db_manager.create_room("BENCHMARK")
+        room_id = Room.query.filter_by(name="BENCHMARK").one().id
+
+        orm = measure(create_tray_orm, room_id)
+        bulk = measure(create_tray_bulk, room_id)
+
+    size = f"{WIDTH}x{HEIGHT}x{NUM_OF_LIGHTS}"
+    print(f"Tray {size} per-object ORM: {orm * 1000:.1f} ms")
+    print(f"Tray {size} bulk insert:    {bulk * 1000:.1f} ms")
+    print(f"Speedup: {orm / bulk:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Gunicorn settings, loaded automatically when gunicorn runs from this directory.
+
+    gunicorn wsgi:app
+
+Every open room page holds a Server-Sent Events stream (/layouts/<id>/events)
+for as long as it is open, so workers use threads: each stream occupies one
+thread instead of a whole sync worker, and gthread workers keep sending their
+heartbeat to the arbiter while streams are open, so ``timeout`` does not cut
+them off. Size GUNICORN_THREADS for the number of open tabs per worker plus
+regular requests.
+
+The default in-memory event broker only reaches streams in its own process,
+so there is a single worker unless EVENTS_BACKEND=redis, and starting more
+workers with the memory broker logs a warning.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SHARED_EVENTS = os.environ.get("EVENTS_BACKEND", "memory") == "redis"
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 2 if SHARED_EVENTS else 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+# Long enough for a slow request, well past the event stream heartbeat.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+
+def on_starting(server) -> None:
+    if server.cfg.workers > 1 and not SHARED_EVENTS:
+        server.log.warning(
+            "%d workers with EVENTS_BACKEND=memory: room updates published in "
+            "one worker will not reach event streams held by the others. "
+            "Set EVENTS_BACKEND=redis or run a single worker.",
+            server.cfg.workers,
+        )
@@ -1,40 +1,90 @@
 from flask import Flask
+from flask.globals import request_ctx
 from flask_login import LoginManager
 from flask_sqlalchemy import SQLAlchemy
+from werkzeug import Response
 
-from .config import DB_NAME, SECRET_KEY
+from .config import BUILD_ID, DATABASE_URL, ENGINE_OPTIONS, LOG_LEVEL, SECRET_KEY
 from .database import DatabaseManager
+from .events import room_events
+from .mail import MailDispatcher
+from .maintenance import TokenSweeper
+from .metrics import metrics
+from .profiling import RequestProfiler
 
 db = SQLAlchemy()
 db_manager = DatabaseManager(db)
+mail_dispatcher = MailDispatcher(db)
+request_profiler = RequestProfiler(db)
+token_sweeper = TokenSweeper(db_manager)
 
 
 def create_app() -> Flask:
     app = Flask(__name__)
+    app.logger.setLevel(LOG_LEVEL)
     app.secret_key = SECRET_KEY
-    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{DB_NAME}"
+    app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = ENGINE_OPTIONS
+
+    from .assets import init_assets
+    from .utils import templates_fingerprint
+
+    manifest = init_assets(app)
+    app.config["ETAG_SALT"] = BUILD_ID or (
+        f"{templates_fingerprint(app)}-{manifest.version}"
+    )
 
     db.init_app(app)
 
     login_manager = LoginManager()
     login_manager.login_view = "auth.login"  # type: ignore
     login_manager.login_message = ""
+    login_manager.blueprint_login_views = {"api": None}  # type: ignore
     login_manager.init_app(app)
 
     from .models import User
 
     @login_manager.user_loader
     def load_user(user_id: str) -> User | None:
-        return db_manager.get_user_by_id(int(user_id))
+        return db_manager.get_cached_user(int(user_id))
+
+    @app.after_request
+    def no_store_flashes(response: Response) -> Response:
+        # A page that showed flashed alerts must not be stored by the service
+        # worker, or the alerts would be replayed when it is shown offline.
+        if request_ctx.flashes:
+            response.headers["Cache-Control"] = "no-store"
+        return response
+
+    from .fragments import render_tray_grid
 
-    from .routes import admin, auth, main, room, team
+    app.add_template_global(render_tray_grid, "tray_grid")
+
+    from .routes import admin, api, assets, auth, main, room, team
 
     app.register_blueprint(admin, url_prefix="/")
+    app.register_blueprint(api, url_prefix="/api/v1")
+    app.register_blueprint(assets, url_prefix="/")
     app.register_blueprint(auth, url_prefix="/")
     app.register_blueprint(main, url_prefix="/")
     app.register_blueprint(room, url_prefix="/")
     app.register_blueprint(team, url_prefix="/")
 
+    from .facility import facility_cli
+
+    app.cli.add_command(facility_cli)
+
+    db_manager.configure_engine(app)
+    request_profiler.init_app(app)
+    metrics.init_app(app, db)
     db_manager.create_tables(app)
+    mail_dispatcher.init_app(app)
+    metrics.register_gauge(
+        "hubsync_mail_queue_depth",
+        "Outgoing mail waiting to be sent.",
+        mail_dispatcher.queue_depth,
+    )
+    room_events.init_app(app)
+    token_sweeper.init_app(app)
 
     return app
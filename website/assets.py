@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import os
+
+from flask import Flask, url_for
+
+from website.bundles import NOT_VENDORED, assets_cli, build_bundles, is_vendored
+from website.config import ASSETS
+from website.utils import write_atomic
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Static files fetched up front by the service worker; everything else under
+# /static is cached the first time it is requested.
+PRECACHE_PREFIXES = (
+    "dist/",
+    "manifest.json",
+    "images/favicon",
+    "images/apple-touch-icon.png",
+    "images/hubsync_logo.png",
+)
+IGNORED_PREFIXES = ("scss/",)
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".json", ".svg", ".ico", ".txt", ".html")
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+class AssetManifest:
+    def __init__(self, files: dict[str, str]) -> None:
+        self.files = files
+        digest = hashlib.sha256()
+        for filename, file_hash in sorted(files.items()):
+            digest.update(f"{filename}:{file_hash}".encode())
+        self.version = digest.hexdigest()[:12]
+
+    @classmethod
+    def build(cls, static_folder: str) -> "AssetManifest":
+        files = {}
+        for root, _, names in os.walk(static_folder):
+            for name in names:
+                path = os.path.join(root, name)
+                filename = os.path.relpath(path, static_folder).replace(os.sep, "/")
+                if filename.startswith(IGNORED_PREFIXES):
+                    continue
+                with open(path, "rb") as f:
+                    files[filename] = hashlib.sha256(f.read()).hexdigest()[:12]
+        return cls(files)
+
+    @property
+    def precache(self) -> list[str]:
+        return sorted(
+            filename
+            for filename in self.files
+            if filename.startswith(PRECACHE_PREFIXES)
+        )
+
+    def to_dict(self) -> dict:
+        return {"version": self.version, "files": self.files}
+
+
+def compressed_path(build_dir: str, filename: str, file_hash: str, suffix: str) -> str:
+    return os.path.join(build_dir, f"{filename}.{file_hash}{suffix}")
+
+
+def precompress(manifest: AssetManifest, static_folder: str, build_dir: str) -> int:
+    """Write .gz (and .br when brotli is installed) variants of text assets.
+
+    Variants are named after the content hash, so unchanged files are not
+    compressed again on the next start.
+    """
+    written = 0
+    for filename, file_hash in manifest.files.items():
+        if not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+            continue
+
+        with open(os.path.join(static_folder, filename), "rb") as f:
+            data = f.read()
+        variants = {".gz": lambda: gzip.compress(data, 9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = lambda: brotli.compress(data)
+
+        for suffix, compress in variants.items():
+            path = compressed_path(build_dir, filename, file_hash, suffix)
+            if os.path.exists(path):
+                continue
+            write_atomic(path, compress())
+            written += 1
+    return written
+
+
+def init_assets(app: Flask) -> AssetManifest:
+    static_folder = app.static_folder or "static"
+    app.cli.add_command(assets_cli)
+    app.config["ASSETS_VENDORED"] = is_vendored(static_folder)
+    if ASSETS["BUNDLE"]:
+        app.config["ASSETS_VENDORED"] = build_bundles(app)
+    if not app.config["ASSETS_VENDORED"]:
+        app.logger.warning(NOT_VENDORED)
+    manifest = AssetManifest.build(static_folder)
+    app.extensions["asset_manifest"] = manifest
+    app.config["ASSET_BUILD_DIR"] = ASSETS["BUILD_DIR"] or os.path.join(
+        app.instance_path, "assets"
+    )
+    if ASSETS["PRECOMPRESS"]:
+        precompress(manifest, static_folder, app.config["ASSET_BUILD_DIR"])
+    app.add_template_global(asset_url)
+    return manifest
+
+
+def asset_url(filename: str) -> str:
+    from flask import current_app
+
+    file_hash = get_asset_manifest(current_app).files.get(filename)
+    if file_hash is None:
+        return url_for("static", filename=filename)
+    return url_for("assets.asset", file_hash=file_hash, filename=filename)
+
+
+def get_asset_manifest(app: Flask) -> AssetManifest:
+    return app.extensions["asset_manifest"]
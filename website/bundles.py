@@ -0,0 +1,308 @@
+import base64
+import hashlib
+import os
+import re
+import urllib.request
+
+import click
+from flask import Flask
+from flask.cli import AppGroup
+
+from website.utils import write_atomic
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:  # pragma: no cover - fonttools is optional
+    font_subset = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+NPM_CDN = "https://cdn.jsdelivr.net/npm/"
+BOOTSTRAP_CDN = f"{NPM_CDN}bootstrap@5.3.8/dist"
+ICONS_CDN = f"{NPM_CDN}bootstrap-icons@1.13.1/font"
+
+# Third-party files copied into static/vendor by `flask assets vendor`,
+# pinned to the versions the templates were written against.
+VENDOR_FILES = {
+    "vendor/bootstrap/bootstrap.min.css": (
+        f"{BOOTSTRAP_CDN}/css/bootstrap.min.css",
+        "sha384-sRIl4kxILFvY47J16cr9ZwB07vP4J8+LH7qKQnuqkuIAvNWLzeN8tE5YBujZqJLB",
+    ),
+    "vendor/bootstrap/bootstrap.bundle.min.js": (
+        f"{BOOTSTRAP_CDN}/js/bootstrap.bundle.min.js",
+        "sha384-FKyoEForCGlyvwx9Hj09JcYn3nv7wiPVlz7YYwJrWVcXK/BmnVDxM+D2scQbITxI",
+    ),
+    "vendor/bootstrap-icons/bootstrap-icons.css": (
+        f"{ICONS_CDN}/bootstrap-icons.css",
+        None,
+    ),
+    "vendor/bootstrap-icons/fonts/bootstrap-icons.woff2": (
+        f"{ICONS_CDN}/fonts/bootstrap-icons.woff2",
+        None,
+    ),
+    "vendor/bootstrap-icons/fonts/bootstrap-icons.woff": (
+        f"{ICONS_CDN}/fonts/bootstrap-icons.woff",
+        None,
+    ),
+}
+
+# Bundle sources, in load order. Vendored files are skipped until they have
+# been downloaded, in which case base.html falls back to the CDN.
+CSS_BUNDLE = ["vendor/bootstrap/bootstrap.min.css", "css/themes.css"]
+JS_BUNDLE = [
+    "vendor/bootstrap/bootstrap.bundle.min.js",
+    "js/auto-alert.js",
+    "js/navbar-manager.js",
+    "js/password-toggle.js",
+    "js/theme-manager.js",
+    "js/pull-to-refresh.js",
+    "js/fragments.js",
+    "js/room-events.js",
+]
+CSS_OUTPUT = "dist/app.min.css"
+JS_OUTPUT = "dist/app.min.js"
+ICONS_CSS = "vendor/bootstrap-icons/bootstrap-icons.css"
+ICONS_FONTS = {
+    "woff2": "vendor/bootstrap-icons/fonts/bootstrap-icons.woff2",
+    "woff": "vendor/bootstrap-icons/fonts/bootstrap-icons.woff",
+}
+
+ICON_CLASS = re.compile(r"\bbi-([a-z0-9]+(?:-[a-z0-9]+)*)")
+ICON_RULE = re.compile(
+    r'\.bi-([a-z0-9-]+)::before\s*\{\s*content:\s*"\\([0-9a-f]+)";\s*\}'
+)
+FONT_FACE = re.compile(r"@font-face\s*\{.*?\}", re.S)
+BLOCK_COMMENT_LINES = re.compile(r"^[ \t]*/\*(?:(?!\*/).)*\*/[ \t]*$", re.S | re.M)
+SOURCE_MAP = re.compile(r"^\s*(?://|/\*)# sourceMappingURL=.*$", re.M)
+
+NOT_VENDORED = (
+    "Bootstrap is not vendored: pages load it from the CDN and the offline "
+    "shell has no styles or icons. Run `flask assets vendor` and commit "
+    "static/vendor."
+)
+
+assets_cli = AppGroup("assets", help="Vendor and bundle static assets.")
+
+
+def minify_js(source: str) -> str:
+    """Drop comments, indentation and blank lines.
+
+    Deliberately conservative: only whole-line comments are removed, so string
+    and regex literals are never touched.
+    """
+    source = BLOCK_COMMENT_LINES.sub("", source)
+    lines = (line.strip() for line in source.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+
+def minify_css(source: str) -> str:
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    source = re.sub(r"\s+", " ", source)
+    source = re.sub(r"\s*([{};,>])\s*", r"\1", source)
+    return source.replace(";}", "}").strip()
+
+
+def used_icons(app: Flask) -> set[str]:
+    """Collect every bi-* icon name referenced by templates and local scripts."""
+    static_folder = app.static_folder or "static"
+    roots = [os.path.join(app.root_path, app.template_folder or "templates")]
+    roots.append(os.path.join(static_folder, "js"))
+
+    names = set()
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                with open(os.path.join(dirpath, filename), encoding="utf-8") as f:
+                    names.update(ICON_CLASS.findall(f.read()))
+    return names
+
+
+def subset_font(path: str, codepoints: list[int], flavor: str) -> bytes | None:
+    if font_subset is None or (flavor == "woff2" and brotli is None):
+        return None
+
+    options = font_subset.Options()
+    options.flavor = flavor
+    options.layout_features = []
+    font = font_subset.load_font(path, options)
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+
+    from io import BytesIO
+
+    buffer = BytesIO()
+    font_subset.save_font(font, buffer, options)
+    return buffer.getvalue()
+
+
+def build_icons_css(app: Flask, static_folder: str, dist_dir: str) -> str:
+    """Return Bootstrap Icons CSS limited to the icons the app references.
+
+    With fonttools installed the font is subset to the same glyphs and
+    inlined; otherwise the full vendored font is copied next to the bundle.
+    """
+    with open(os.path.join(static_folder, ICONS_CSS), encoding="utf-8") as f:
+        source = f.read()
+
+    names = used_icons(app)
+    codepoints = []
+
+    def keep(match: re.Match) -> str:
+        if match.group(1) not in names:
+            return ""
+        codepoints.append(int(match.group(2), 16))
+        return match.group(0)
+
+    css = ICON_RULE.sub(keep, source)
+
+    sources = []
+    for flavor, filename in ICONS_FONTS.items():
+        path = os.path.join(static_folder, filename)
+        data = subset_font(path, codepoints, flavor)
+        if data is not None:
+            encoded = base64.b64encode(data).decode()
+            sources.append(
+                f'url("data:font/{flavor};base64,{encoded}") format("{flavor}")'
+            )
+            break
+    else:
+        fonts_dir = os.path.join(dist_dir, "fonts")
+        for flavor, filename in ICONS_FONTS.items():
+            with open(os.path.join(static_folder, filename), "rb") as f:
+                write_atomic(
+                    os.path.join(fonts_dir, os.path.basename(filename)), f.read()
+                )
+            sources.append(
+                f'url("fonts/{os.path.basename(filename)}") format("{flavor}")'
+            )
+
+    font_face = (
+        '@font-face{font-display:block;font-family:"bootstrap-icons";'
+        f"src:{','.join(sources)}}}"
+    )
+    return FONT_FACE.sub(lambda _: font_face, css, count=1)
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    data = content.encode("utf-8")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if hashlib.sha256(f.read()).digest() == hashlib.sha256(data).digest():
+                return False
+    write_atomic(path, data)
+    return True
+
+
+def is_vendored(static_folder: str) -> bool:
+    return all(
+        os.path.exists(os.path.join(static_folder, filename))
+        for filename in VENDOR_FILES
+    )
+
+
+def build_bundles(app: Flask) -> bool:
+    """Concatenate and minify the CSS and JS bundles into static/dist.
+
+    Returns whether the vendored Bootstrap files were included; when they
+    were not, base.html still loads them from the CDN.
+    """
+    static_folder = app.static_folder or "static"
+    dist_dir = os.path.join(static_folder, "dist")
+    vendored = is_vendored(static_folder)
+
+    def read(filename: str) -> str | None:
+        if filename.startswith("vendor/") and not vendored:
+            return None
+        with open(os.path.join(static_folder, filename), encoding="utf-8") as f:
+            return SOURCE_MAP.sub("", f.read()).strip()
+
+    css_parts = []
+    for filename in CSS_BUNDLE:
+        source = read(filename)
+        if source is not None:
+            css_parts.append(
+                source if filename.endswith(".min.css") else minify_css(source)
+            )
+    if vendored:
+        css_parts.insert(1, minify_css(build_icons_css(app, static_folder, dist_dir)))
+
+    js_parts = []
+    for filename in JS_BUNDLE:
+        source = read(filename)
+        if source is not None:
+            js_parts.append(
+                source if filename.endswith(".min.js") else minify_js(source)
+            )
+
+    write_if_changed(os.path.join(static_folder, CSS_OUTPUT), "\n".join(css_parts))
+    write_if_changed(os.path.join(static_folder, JS_OUTPUT), ";\n".join(js_parts))
+    return vendored
+
+
+def package_path(url: str) -> str:
+    """Map a CDN URL to its path inside node_modules, without the version."""
+    package, _, path = url.removeprefix(NPM_CDN).partition("/")
+    return os.path.join(package.rsplit("@", 1)[0], path)
+
+
+def vendor_assets(
+    static_folder: str, force: bool = False, source: str | None = None
+) -> list[str]:
+    """Copy the pinned files into static/vendor, from the CDN or ``source``.
+
+    ``source`` is a node_modules directory with the bootstrap and
+    bootstrap-icons packages installed, for builds without network access.
+    """
+    downloaded = []
+    for filename, (url, integrity) in VENDOR_FILES.items():
+        path = os.path.join(static_folder, filename)
+        if os.path.exists(path) and not force:
+            continue
+
+        if source is not None:
+            with open(os.path.join(source, package_path(url)), "rb") as f:
+                data = f.read()
+        else:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                data = response.read()
+        if integrity is not None:
+            algorithm, expected = integrity.split("-", 1)
+            digest = base64.b64encode(hashlib.new(algorithm, data).digest()).decode()
+            if digest != expected:
+                raise click.ClickException(f"Integrity check failed for {url}")
+
+        write_atomic(path, data)
+        downloaded.append(filename)
+    return downloaded
+
+
+@assets_cli.command("vendor")
+@click.option("--force", is_flag=True, help="Download files that already exist.")
+@click.option(
+    "--source",
+    type=click.Path(exists=True, file_okay=False),
+    help="Copy from this node_modules directory instead of the CDN.",
+)
+def vendor_command(force: bool, source: str | None) -> None:
+    """Download the pinned Bootstrap and Bootstrap Icons files."""
+    from flask import current_app
+
+    downloaded = vendor_assets(current_app.static_folder or "static", force, source)
+    for filename in downloaded:
+        click.echo(f"Downloaded {filename}")
+    click.echo(f"Vendored {len(downloaded)} files")
+
+
+@assets_cli.command("build")
+def build_command() -> None:
+    """Rebuild the CSS and JS bundles."""
+    from flask import current_app
+
+    vendored = build_bundles(current_app)
+    click.echo(f"Built {CSS_OUTPUT} and {JS_OUTPUT} (vendored: {vendored})")
+    if not vendored:
+        click.echo(NOT_VENDORED, err=True)
@@ -1,16 +1,109 @@
 import os
 
 from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
 
 load_dotenv()
 
 APP_NAME = "HubSync"
 
 SECRET_KEY = os.environ.get("SECRET_KEY")
+BUILD_ID = os.environ.get("BUILD_ID")
+# Flask's logger otherwise only passes warnings and above.
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
 DB_NAME = "database.db"
+DATABASE_URL = os.environ.get("DATABASE_URL", f"sqlite:///{DB_NAME}").replace(
+    "postgres://", "postgresql://", 1
+)
+
+SQLITE_PRAGMAS = {
+    "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000)),
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", -64 * 1024)),
+    "foreign_keys": os.environ.get("SQLITE_FOREIGN_KEYS", "ON"),
+}
+
+ENGINE_OPTIONS = {
+    "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+    "pool_pre_ping": not DATABASE_URL.startswith("sqlite"),
+}
+
+# In-memory SQLite gets a StaticPool or SingletonThreadPool, which reject the
+# QueuePool sizing options.
+_url = make_url(DATABASE_URL)
+if not (
+    _url.get_backend_name() == "sqlite"
+    and (_url.database in (None, "", ":memory:") or _url.query.get("mode") == "memory")
+):
+    ENGINE_OPTIONS["pool_size"] = int(os.environ.get("DB_POOL_SIZE", 5))
+    ENGINE_OPTIONS["max_overflow"] = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+
+PROFILER = {
+    "ENABLED": os.environ.get("PROFILER", "0") == "1",
+    "SLOW_REQUEST_MS": float(os.environ.get("PROFILER_SLOW_REQUEST_MS", 500)),
+    "MAX_QUERIES": int(os.environ.get("PROFILER_MAX_QUERIES", 30)),
+    "SLOWEST_STATEMENTS": int(os.environ.get("PROFILER_SLOWEST_STATEMENTS", 3)),
+    "LOG_FILE": os.environ.get("PROFILER_LOG_FILE"),
+}
+
+METRICS = {
+    "ENABLED": os.environ.get("METRICS", "1") == "1",
+    "DIR": os.environ.get("METRICS_DIR"),
+}
+
+FACILITY = {
+    "IMPORT_BATCH_SIZE": int(os.environ.get("FACILITY_IMPORT_BATCH_SIZE", 200)),
+    "EXPORT_BATCH_SIZE": int(os.environ.get("FACILITY_EXPORT_BATCH_SIZE", 2000)),
+}
+
+# Invalidation only reaches the worker that changed a user, so TTL bounds how
+# long other workers may keep a stale role or a deleted account.
+USER_CACHE = {
+    "MAX_SIZE": int(os.environ.get("USER_CACHE_MAX_SIZE", 256)),
+    "TTL": int(os.environ.get("USER_CACHE_TTL", 10)),
+}
+
+PASSWORD_HASH = {
+    "METHOD": os.environ.get("PASSWORD_HASH_METHOD", "scrypt"),
+    "SALT_LENGTH": int(os.environ.get("PASSWORD_HASH_SALT_LENGTH", 16)),
+    "WORKERS": int(os.environ.get("PASSWORD_HASH_WORKERS", 2)),
+    "MAX_QUEUE": int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", 16)),
+    "TIMEOUT": float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10)),
+}
+
+TOKEN_SWEEPER = {
+    "ENABLED": os.environ.get("TOKEN_SWEEPER", "1") == "1",
+    "INTERVAL": float(os.environ.get("TOKEN_SWEEP_INTERVAL", 3600)),
+    "BATCH_SIZE": int(os.environ.get("TOKEN_SWEEP_BATCH_SIZE", 500)),
+}
+
+FRAGMENT_CACHE = {
+    "MAX_SIZE": int(os.environ.get("FRAGMENT_CACHE_MAX_SIZE", 1024)),
+    "TTL": int(os.environ.get("FRAGMENT_CACHE_TTL", 3600)),
+}
+
+EVENTS = {
+    "BACKEND": os.environ.get("EVENTS_BACKEND", "memory"),
+    "URL": os.environ.get("EVENTS_URL", "redis://localhost:6379/0"),
+    "HEARTBEAT": int(os.environ.get("EVENTS_HEARTBEAT", 15)),
+    "MAX_QUEUE": int(os.environ.get("EVENTS_MAX_QUEUE", 100)),
+    "RETRY": int(os.environ.get("EVENTS_RETRY", 3000)),
+}
+
+ASSETS = {
+    "BUILD_DIR": os.environ.get("ASSET_BUILD_DIR"),
+    "BUNDLE": os.environ.get("ASSET_BUNDLE", "1") == "1",
+    "PRECOMPRESS": os.environ.get("ASSET_PRECOMPRESS", "1") == "1",
+    "MAX_AGE": 365 * 24 * 3600,
+}
 
 MIN_LENGTHS = {"email": 5, "name": 2, "password": 3, "username": 2}
 
+# Upper bounds of the tray forms; every tray has at least one of each.
+MAX_TRAY_SIZES = {"lights": 6, "width": 5, "height": 5}
+
 MAIL_CONFIG = {
     "SERVER": os.environ.get("MAIL_SERVER", "smtp.example.com"),
     "PORT": int(os.environ.get("MAIL_PORT", 587)),
@@ -18,4 +111,10 @@ MAIL_CONFIG = {
     "PASSWORD": os.environ.get("MAIL_PASSWORD", ""),
     "AUTHOR": f"Auth {APP_NAME}",
     "SENDER": f"no-reply@{APP_NAME.lower()}.com",
+    "USE_SSL": os.environ.get("MAIL_USE_SSL", "1") == "1",
+    "DISPATCHER": os.environ.get("MAIL_DISPATCHER", "1") == "1",
+    "POLL_INTERVAL": float(os.environ.get("MAIL_POLL_INTERVAL", 5)),
+    "MAX_ATTEMPTS": int(os.environ.get("MAIL_MAX_ATTEMPTS", 5)),
+    "RETRY_BACKOFF": float(os.environ.get("MAIL_RETRY_BACKOFF", 30)),
+    "LEASE": float(os.environ.get("MAIL_LEASE", 60)),
 }
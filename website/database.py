@@ -1,35 +1,102 @@
-from typing import TYPE_CHECKING
+from datetime import datetime
+from itertools import groupby, islice
+from typing import TYPE_CHECKING, Iterable, Iterator
 
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import check_password_hash, generate_password_hash
 
-from website.utils import Role
+from website.config import SQLITE_PRAGMAS, USER_CACHE
+from website.events import room_events
+from website.utils import PasswordHasherBusy, Role, TTLCache, password_hasher
+
+BUSY_MESSAGE = "Server is busy, please try again"
 
 if TYPE_CHECKING:
-    from website.models import PasswordResetToken, Room, User
+    from website.models import PasswordResetToken, Room, Tray, User
 
 
 class Response:
-    def __init__(self, type: str, message: str) -> None:
+    def __init__(self, type: str, message: str, id: int | None = None) -> None:
         self.type = type
         self.message = message
+        self.id = id
+
+
+def sqlite_pragma_listener(pragmas: dict[str, str | int]):
+    def set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return set_pragmas
+
+
+class RoomSummary:
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        tray_count: int,
+        planted_date: datetime | None,
+        harvest_date: datetime | None,
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.tray_count = tray_count
+        self.planted_date = planted_date
+        self.harvest_date = harvest_date
+
+    @property
+    def is_planted(self) -> bool:
+        return self.planted_date is not None
+
+    @property
+    def days_since_planted(self) -> int:
+        if not self.planted_date:
+            return 0
+        return (datetime.now() - self.planted_date).days
+
+    @property
+    def days_for_harvest(self) -> int:
+        if not self.harvest_date:
+            return 0
+        return (self.harvest_date - datetime.now()).days
 
 
 class DatabaseManager:
     def __init__(self, db: SQLAlchemy) -> None:
         self.db = db
+        self.user_cache = TTLCache(USER_CACHE["MAX_SIZE"], USER_CACHE["TTL"])
+        self._has_users = False
 
     def has_users(self) -> bool:
         from website.models import User
 
-        return self.db.session.query(User).first() is not None
+        # Only a positive answer is cached: other workers may still create the
+        # first user, so "no users" is always rechecked against the database.
+        if not self._has_users:
+            self._has_users = self.db.session.query(User).first() is not None
+        return self._has_users
 
     def get_user_by_id(self, user_id: int) -> "User | None":
         from website.models import User
 
         return User.query.get(user_id)
 
+    def get_cached_user(self, user_id: int) -> "User | None":
+        # A hit never touches the database. Writes invalidate the entry only in
+        # the worker that made them; other workers see them after USER_CACHE
+        # TTL seconds.
+        snapshot = self.user_cache.get(user_id)
+        if snapshot is None:
+            snapshot = self.get_user_by_id(user_id)
+            if not snapshot:
+                return None
+            self.db.session.expunge(snapshot)
+            self.user_cache.set(user_id, snapshot)
+        return self.db.session.merge(snapshot, load=False)
+
     def get_user_by_email(self, email: str) -> "User | None":
         from website.models import User
 
@@ -53,10 +120,14 @@ class DatabaseManager:
             role=role,
         )
         self.db.session.add(new_user)
+        self.bump_revisions("users")
         self.db.session.commit()
+        self._has_users = True
         return new_user
 
     def delete_user(self, user_id: int) -> Response:
+        from website.models import PasswordResetToken
+
         try:
             user = self.get_user_by_id(user_id)
             if not user:
@@ -67,8 +138,12 @@ class DatabaseManager:
                     type="danger", message="Cannot delete the primary admin user"
                 )
 
+            PasswordResetToken.query.filter_by(user_id=user_id).delete()
             self.db.session.delete(user)
+            self.bump_revisions("users")
             self.db.session.commit()
+            self.user_cache.invalidate(user_id)
+            self._has_users = False
             return Response(
                 type="success", message=f"{user.display_name} deleted successfully"
             )
@@ -103,7 +178,9 @@ class DatabaseManager:
             if role:
                 user.role = role
 
+            self.bump_revisions("users")
             self.db.session.commit()
+            self.user_cache.invalidate(user_id)
             return Response(type="success", message="Profile updated successfully")
 
         except Exception as e:
@@ -118,29 +195,45 @@ class DatabaseManager:
             if not user:
                 return Response(type="danger", message="User not found")
 
-            if not check_password_hash(user.password, current_password):
+            if not password_hasher.verify(user.password, current_password):
                 return Response(type="danger", message="Current password is incorrect")
 
-            user.password = generate_password_hash(new_password)
+            user.password = password_hasher.hash(new_password)
             self.db.session.commit()
+            self.user_cache.invalidate(user.id)
 
             return Response(type="success", message="Password changed successfully")
 
+        except PasswordHasherBusy:
+            self.db.session.rollback()
+            return Response(type="warning", message=BUSY_MESSAGE)
         except Exception as e:
             self.db.session.rollback()
             return Response(type="danger", message=f"Error changing password: {str(e)}")
 
+    def rehash_password(self, user: "User", password: str) -> None:
+        try:
+            user.password = password_hasher.hash(password)
+            self.db.session.commit()
+            self.user_cache.invalidate(user.id)
+        except Exception:
+            self.db.session.rollback()
+
     def reset_password(self, new_password: str, email: str) -> Response:
         try:
             user = self.get_user_by_email(email)
             if not user:
                 return Response(type="danger", message="User not found")
 
-            user.password = generate_password_hash(new_password)
+            user.password = password_hasher.hash(new_password)
             self.db.session.commit()
+            self.user_cache.invalidate(user.id)
 
             return Response(type="success", message="Password reset successfully")
 
+        except PasswordHasherBusy:
+            self.db.session.rollback()
+            return Response(type="warning", message=BUSY_MESSAGE)
         except Exception as e:
             self.db.session.rollback()
             return Response(
@@ -165,22 +258,167 @@ class DatabaseManager:
     ) -> tuple[str, "PasswordResetToken"] | tuple[None, None]:
         from website.models import PasswordResetToken
 
-        reset_token = PasswordResetToken.query.filter_by(token=token).first()
-        if not reset_token or reset_token.used:
-            return None, None
-        if reset_token.is_expired():
-            self.db.session.delete(reset_token)
-            self.db.session.commit()
+        reset_token = PasswordResetToken.query.filter(
+            PasswordResetToken.token == token,
+            PasswordResetToken.used.is_(False),
+            PasswordResetToken.expires_at > datetime.now(),
+        ).first()
+        if not reset_token:
             return None, None
 
         user = self.get_user_by_id(reset_token.user_id)
         return (user.email, reset_token) if user else (None, None)
 
+    def purge_reset_tokens(self, batch_size: int = 500) -> int:
+        from sqlalchemy import delete, or_, select
+
+        from website.models import PasswordResetToken
+
+        purged = 0
+        while True:
+            ids = self.db.session.scalars(
+                select(PasswordResetToken.id)
+                .where(
+                    or_(
+                        PasswordResetToken.used.is_(True),
+                        PasswordResetToken.expires_at <= datetime.now(),
+                    )
+                )
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                return purged
+
+            self.db.session.execute(
+                delete(PasswordResetToken).where(PasswordResetToken.id.in_(ids))
+            )
+            self.db.session.commit()
+            purged += len(ids)
+
+    def get_revisions(self, names: list[str]) -> dict[str, int]:
+        from sqlalchemy import select
+
+        from website.models import Revision
+
+        revisions = {name: 0 for name in names}
+        # Columns rather than entities, so values changed by an upsert in this
+        # session are never read back from the identity map.
+        revisions.update(
+            self.db.session.execute(
+                select(Revision.name, Revision.value).where(Revision.name.in_(names))
+            ).all()
+        )
+        return revisions
+
+    def bump_revisions(self, *names: str) -> dict[str, int]:
+        from sqlalchemy import update
+
+        from website.models import Revision
+
+        names = tuple(dict.fromkeys(names))
+        dialect = self.db.session.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            # A single upsert, so two requests creating the same revision at
+            # once both succeed instead of one failing on the primary key.
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+
+            upsert = insert(Revision).values(
+                [{"name": name, "value": 1} for name in names]
+            )
+            return dict(
+                self.db.session.execute(
+                    upsert.on_conflict_do_update(
+                        index_elements=[Revision.name],
+                        set_={"value": Revision.value + 1},
+                    ).returning(Revision.name, Revision.value)
+                ).all()
+            )
+
+        revisions = dict(
+            self.db.session.execute(
+                update(Revision)
+                .where(Revision.name.in_(names))
+                .values(value=Revision.value + 1)
+                .returning(Revision.name, Revision.value)
+            ).all()
+        )
+        for name in set(names) - set(revisions):
+            revision = Revision(name)
+            self.db.session.add(revision)
+            revisions[name] = revision.value
+        return revisions
+
+    def next_tray_version(self) -> int:
+        """A tray version never handed out before, for any tray.
+
+        Cached tray grids are keyed by tray id and version, and SQLite reuses
+        the id of a deleted tray, so versions come from one counter instead
+        of starting again at zero for every new tray.
+        """
+        return self.bump_revisions("tray_versions")["tray_versions"]
+
+    def publish_room_event(
+        self, room_id: int, type: str, revisions: dict[str, int], **data
+    ) -> None:
+        room_events.publish(room_id, type, revisions[f"room:{room_id}"], **data)
+
     def get_room_by_id(self, room_id: int) -> "Room | None":
         from website.models import Room
 
         return Room.query.get(room_id)
 
+    def get_room_layout(self, room_id: int) -> "Room | None":
+        from sqlalchemy.orm import selectinload
+
+        from website.models import Room, Tray
+
+        return (
+            Room.query.options(selectinload(Room.trays).selectinload(Tray.lights))
+            .filter_by(id=room_id)
+            .first()
+        )
+
+    def load_tray_pots(self, trays: "list[Tray]") -> None:
+        from sqlalchemy.orm import selectinload
+
+        from website.models import Light, Pot
+
+        light_ids = [light.id for tray in trays for light in tray.lights]
+        if not light_ids:
+            return
+
+        Light.query.options(selectinload(Light.pots).selectinload(Pot.strain)).filter(
+            Light.id.in_(light_ids)
+        ).all()
+
+    def get_room_summaries(
+        self, room_ids: list[int] | None = None
+    ) -> list[RoomSummary]:
+        from sqlalchemy import case, func, select
+
+        from website.models import Room, Tray
+
+        query = (
+            select(
+                Room.id,
+                Room.name,
+                func.count(Tray.id),
+                func.min(Tray.planted_date),
+                func.min(
+                    case((Tray.planted_date.is_not(None), Tray.harvest_date))
+                ).label("harvest_date"),
+            )
+            .outerjoin(Tray, Tray.room_id == Room.id)
+            .group_by(Room.id)
+            .order_by(Room.id)
+        )
+        if room_ids is not None:
+            query = query.where(Room.id.in_(room_ids))
+        return [RoomSummary(*row) for row in self.db.session.execute(query)]
+
     def create_room(self, name: str) -> Response:
         from website.models import Room
 
@@ -189,8 +427,13 @@ class DatabaseManager:
                 return Response(type="danger", message="Room already exists")
             new_room = Room(name)
             self.db.session.add(new_room)
+            self.bump_revisions("rooms")
             self.db.session.commit()
-            return Response(type="success", message=f"Room {name} created successfully")
+            return Response(
+                type="success",
+                message=f"Room {name} created successfully",
+                id=new_room.id,
+            )
 
         except Exception as e:
             self.db.session.rollback()
@@ -203,7 +446,9 @@ class DatabaseManager:
                 return Response(type="danger", message="Room not found")
 
             self.db.session.delete(room)
+            revisions = self.bump_revisions("rooms", f"room:{room_id}")
             self.db.session.commit()
+            self.publish_room_event(room_id, "room_deleted", revisions)
             return Response(
                 type="success", message=f"Room {room.name} deleted successfully"
             )
@@ -224,9 +469,13 @@ class DatabaseManager:
                 return Response(type="danger", message="Room name already exists")
 
             room.name = new_name
+            revisions = self.bump_revisions("rooms", f"room:{room_id}")
             self.db.session.commit()
+            self.publish_room_event(room_id, "room_updated", revisions, name=new_name)
             return Response(
-                type="success", message=f"Room {new_name} updated successfully"
+                type="success",
+                message=f"Room {new_name} updated successfully",
+                id=room.id,
             )
 
         except Exception as e:
@@ -235,22 +484,133 @@ class DatabaseManager:
                 type="danger", message=f"Error updating room name: {str(e)}"
             )
 
-    def add_tray_to_room(
+    def get_tray_by_id(self, tray_id: int) -> "Tray | None":
+        from website.models import Tray
+
+        return Tray.query.get(tray_id)
+
+    def create_tray(
         self, room_id: int, tray_name: str, num_of_lights: int, width: int, height: int
-    ) -> Response:
+    ) -> "Tray":
         from website.models import Tray
 
+        tray = Tray(room_id, tray_name)
+        tray.version = self.next_tray_version()
+        self.db.session.add(tray)
+        self.db.session.flush()
+        self.add_lights_to_tray(tray, num_of_lights, width, height)
+        return tray
+
+    def add_lights_to_tray(
+        self, tray: "Tray", amount: int, width: int, height: int
+    ) -> list[int]:
+        from sqlalchemy import insert
+
+        from website.models import Light, Pot
+
+        if amount <= 0:
+            return []
+
+        light_ids = list(
+            self.db.session.scalars(
+                insert(Light).returning(Light.id, sort_by_parameter_order=True),
+                [
+                    {"tray_id": tray.id, "width": width, "height": height}
+                    for _ in range(amount)
+                ],
+            )
+        )
+        self.db.session.execute(
+            insert(Pot),
+            [
+                {"light_id": light_id, "position": position}
+                for light_id in light_ids
+                for position in range(width * height)
+            ],
+        )
+        self.db.session.expire(tray, ["lights"])
+        return light_ids
+
+    def resize_tray(
+        self, tray: "Tray", num_of_lights: int, width: int, height: int
+    ) -> None:
+        """Resize a tray in place, keeping pot ids and strains where they fit.
+
+        Every pot that still fits keeps its id, strain and grid cell, and only
+        gets a new ``position`` when the height changes. Pots and lights that
+        fall outside the new grid are deleted and only the missing cells are
+        inserted.
+        """
+        from sqlalchemy import delete, insert, update
+
+        from website.models import Light, Pot
+
+        lights = list(tray.lights)
+        kept, removed = lights[:num_of_lights], lights[num_of_lights:]
+
+        if removed:
+            removed_ids = [light.id for light in removed]
+            self.db.session.execute(delete(Pot).where(Pot.light_id.in_(removed_ids)))
+            self.db.session.execute(delete(Light).where(Light.id.in_(removed_ids)))
+
+        light_updates: list[dict] = []
+        pot_updates: list[dict] = []
+        pot_inserts: list[dict] = []
+        pot_deletes: list[int] = []
+        for light in kept:
+            if light.width == width and light.height == height:
+                continue
+
+            kept_positions = set()
+            for pot in light.pots:
+                col, row = divmod(pot.position, light.height)
+                if col >= width or row >= height:
+                    pot_deletes.append(pot.id)
+                    continue
+                position = col * height + row
+                kept_positions.add(position)
+                if position != pot.position:
+                    pot_updates.append({"id": pot.id, "position": position})
+            pot_inserts.extend(
+                {"light_id": light.id, "position": position}
+                for position in range(width * height)
+                if position not in kept_positions
+            )
+            light_updates.append({"id": light.id, "width": width, "height": height})
+
+        # Insert before deleting, so SQLite cannot hand a deleted pot's id to
+        # a new cell.
+        if pot_inserts:
+            self.db.session.execute(insert(Pot), pot_inserts)
+        if pot_updates:
+            self.db.session.execute(update(Pot), pot_updates)
+        if pot_deletes:
+            self.db.session.execute(delete(Pot).where(Pot.id.in_(pot_deletes)))
+        if light_updates:
+            self.db.session.execute(update(Light), light_updates)
+
+        for light in kept:
+            self.db.session.expire(light)
+        self.db.session.expire(tray, ["lights"])
+
+        self.add_lights_to_tray(tray, num_of_lights - len(lights), width, height)
+
+    def add_tray_to_room(
+        self, room_id: int, tray_name: str, num_of_lights: int, width: int, height: int
+    ) -> Response:
         try:
             room = self.get_room_by_id(room_id)
             if not room:
                 return Response(type="danger", message="Room not found")
 
-            tray = Tray(room.id, tray_name, num_of_lights, width, height)
-            self.db.session.add(tray)
+            tray = self.create_tray(room.id, tray_name, num_of_lights, width, height)
+            revisions = self.bump_revisions("rooms", f"room:{room_id}")
             self.db.session.commit()
+            self.publish_room_event(room_id, "tray_added", revisions, tray_id=tray.id)
             return Response(
                 type="success",
                 message=f"Tray {tray_name} added to {room.name} successfully",
+                id=tray.id,
             )
 
         except Exception as e:
@@ -262,31 +622,23 @@ class DatabaseManager:
     def edit_tray(
         self, tray_id: int, tray_name: str, num_of_lights: int, width: int, height: int
     ) -> Response:
-        from website.models import Tray
-
         try:
-            tray = Tray.query.get(tray_id)
+            tray = self.get_tray_by_id(tray_id)
             if not tray:
                 return Response(type="danger", message="Tray not found")
 
             tray.name = tray_name
-            light = tray.lights[0]
-
-            diff = len(tray.lights) - num_of_lights
-            if diff > 0:
-                tray.lights = tray.lights[0 : len(tray.lights) - diff]
-            elif diff < 0:
-                tray.add_lights(abs(diff), light.width, light.height)
-
-            if light.width != width or light.height != height:
-                room_id = tray.room_id
-                self.delete_tray(tray_id)
-                self.add_tray_to_room(room_id, tray_name, num_of_lights, width, height)
-
+            tray.version = self.next_tray_version()
+            self.resize_tray(tray, num_of_lights, width, height)
+            revisions = self.bump_revisions("rooms", f"room:{tray.room_id}")
             self.db.session.commit()
+            self.publish_room_event(
+                tray.room_id, "tray_updated", revisions, tray_id=tray.id
+            )
             return Response(
                 type="success",
                 message=f"Tray {tray_name} updated successfully",
+                id=tray.id,
             )
 
         except Exception as e:
@@ -294,15 +646,17 @@ class DatabaseManager:
             return Response(type="danger", message=f"Error updating tray: {str(e)}")
 
     def delete_tray(self, tray_id: int) -> Response:
-        from website.models import Tray
-
         try:
-            tray = Tray.query.get(tray_id)
+            tray = self.get_tray_by_id(tray_id)
             if not tray:
                 return Response(type="danger", message="Tray not found")
 
             self.db.session.delete(tray)
+            revisions = self.bump_revisions("rooms", f"room:{tray.room_id}")
             self.db.session.commit()
+            self.publish_room_event(
+                tray.room_id, "tray_deleted", revisions, tray_id=tray.id
+            )
             return Response(
                 type="success", message=f"Tray {tray.name} deleted successfully"
             )
@@ -311,10 +665,415 @@ class DatabaseManager:
             self.db.session.rollback()
             return Response(type="danger", message=f"Error deleting tray: {str(e)}")
 
+    def get_or_create_strain(self, name: str) -> int:
+        from sqlalchemy import select
+
+        from website.models import Strain
+
+        strain_id = self.db.session.scalar(select(Strain.id).filter_by(name=name))
+        if strain_id is None:
+            strain = Strain(name=name)
+            self.db.session.add(strain)
+            self.db.session.flush()
+            strain_id = strain.id
+        return strain_id
+
+    def assign_strain(
+        self,
+        room_id: int,
+        strain_name: str,
+        tray_id: int | None = None,
+        pot_ids: list[int] | None = None,
+        region: tuple[int, int, int, int] | None = None,
+        planted_date: datetime | None = None,
+        harvest_date: datetime | None = None,
+    ) -> Response:
+        """Plant one strain in every pot of a room, a tray or part of a tray.
+
+        Without ``tray_id`` the whole room is planted. With it, ``pot_ids``
+        limits the pots to those ids and ``region`` to the grid cells from
+        ``(first_row, first_col)`` to ``(last_row, last_col)``, zero-based and
+        inclusive. Pots are updated with a single UPDATE and the trays get
+        their planted date (kept if already planted, unless one is given) and
+        harvest date in the same transaction.
+        """
+        from sqlalchemy import func, select, update
+
+        from website.models import Light, Pot, Tray
+
+        try:
+            room = self.get_room_by_id(room_id)
+            if not room:
+                return Response(type="danger", message="Room not found")
+            if not strain_name:
+                return Response(type="danger", message="Strain name is required")
+            if tray_id is None and (pot_ids is not None or region is not None):
+                return Response(type="danger", message="Choose a tray for the pots")
+
+            if tray_id is None:
+                tray_ids = list(
+                    self.db.session.scalars(select(Tray.id).filter_by(room_id=room_id))
+                )
+            else:
+                tray = self.get_tray_by_id(tray_id)
+                if not tray or tray.room_id != room_id:
+                    return Response(type="danger", message="Tray not found")
+                tray_ids = [tray_id]
+
+            pots = Pot.light_id.in_(select(Light.id).where(Light.tray_id.in_(tray_ids)))
+            if pot_ids is not None:
+                pots = pots & Pot.id.in_(pot_ids)
+            if region is not None:
+                # Pots are ordered column-major through the tray, light by
+                # light, so a pot's grid cell follows from its rank.
+                first_row, first_col, last_row, last_col = region
+                rows = tray.lights[0].height if tray.lights else 1
+                ranked = (
+                    select(
+                        Pot.id,
+                        (
+                            func.row_number().over(order_by=(Light.id, Pot.position))
+                            - 1
+                        ).label("rank"),
+                    )
+                    .join(Light, Light.id == Pot.light_id)
+                    .where(Light.tray_id == tray_id)
+                    .subquery()
+                )
+                pots = pots & Pot.id.in_(
+                    select(ranked.c.id).where(
+                        (ranked.c.rank % rows).between(first_row, last_row),
+                        (ranked.c.rank // rows).between(first_col, last_col),
+                    )
+                )
+
+            strain_id = self.get_or_create_strain(strain_name)
+            planted = self.db.session.execute(
+                update(Pot)
+                .where(pots)
+                .values(strain_id=strain_id)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not planted:
+                self.db.session.rollback()
+                return Response(type="danger", message="No pots to plant")
+
+            tray_values: dict = {
+                "version": self.next_tray_version(),
+                "planted_date": planted_date
+                or func.coalesce(Tray.planted_date, datetime.now()),
+            }
+            if harvest_date:
+                tray_values["harvest_date"] = harvest_date
+            self.db.session.execute(
+                update(Tray)
+                .where(Tray.id.in_(tray_ids))
+                .values(**tray_values)
+                .execution_options(synchronize_session=False)
+            )
+            revisions = self.bump_revisions("rooms", f"room:{room_id}")
+            self.db.session.commit()
+            if tray_id is None:
+                self.publish_room_event(room_id, "room_updated", revisions)
+            else:
+                self.publish_room_event(
+                    room_id, "tray_updated", revisions, tray_id=tray_id
+                )
+            return Response(
+                type="success",
+                message=f"{strain_name} planted in {planted} pots",
+                id=tray_id,
+            )
+
+        except Exception as e:
+            self.db.session.rollback()
+            return Response(type="danger", message=f"Error planting strain: {str(e)}")
+
+    def get_existing_room_names(self, names: Iterable[str]) -> set[str]:
+        from sqlalchemy import select
+
+        from website.models import Room
+
+        names = list(names)
+        existing: set[str] = set()
+        for start in range(0, len(names), 500):
+            existing.update(
+                self.db.session.scalars(
+                    select(Room.name).where(Room.name.in_(names[start : start + 500]))
+                )
+            )
+        return existing
+
+    def import_facility(
+        self, records: Iterable[dict], batch_size: int = 200
+    ) -> Response:
+        """Create rooms, trays, lights and pots from validated import records.
+
+        Records are taken ``batch_size`` at a time; each batch is written with
+        one bulk INSERT per table and committed on its own, so memory use does
+        not grow with the size of the import. Strains are matched by name and
+        only the missing ones are created.
+        """
+        room_ids: dict[str, int] = {}
+        strain_ids: dict[str, int] = {}
+        counts = {"rooms": 0, "trays": 0, "pots": 0}
+        records = iter(records)
+        try:
+            while batch := list(islice(records, batch_size)):
+                self._import_batch(batch, room_ids, strain_ids, counts)
+        except Exception as e:
+            self.db.session.rollback()
+            return Response(
+                type="danger",
+                message=f"Error importing facility after {counts['trays']} trays: "
+                f"{str(e)}",
+            )
+        return Response(
+            type="success",
+            message=f"Imported {counts['rooms']} rooms, {counts['trays']} trays "
+            f"and {counts['pots']} pots",
+        )
+
+    def _import_batch(
+        self,
+        batch: list[dict],
+        room_ids: dict[str, int],
+        strain_ids: dict[str, int],
+        counts: dict[str, int],
+    ) -> None:
+        from sqlalchemy import insert, select
+
+        from website.models import Light, Pot, Room, Strain, Tray
+
+        new_rooms = list(
+            dict.fromkeys(r["room"] for r in batch if r["room"] not in room_ids)
+        )
+        if new_rooms:
+            rows = self.db.session.execute(
+                insert(Room).returning(
+                    Room.id, Room.name, sort_by_parameter_order=True
+                ),
+                [{"name": name} for name in new_rooms],
+            )
+            room_ids.update((name, room_id) for room_id, name in rows)
+            counts["rooms"] += len(new_rooms)
+
+        strain_names = {
+            name for r in batch for name in r["strains"] if name not in strain_ids
+        }
+        strain_names.discard(None)
+        if strain_names:
+            rows = self.db.session.execute(
+                select(Strain.id, Strain.name).where(Strain.name.in_(strain_names))
+            )
+            strain_ids.update((name, strain_id) for strain_id, name in rows)
+            missing = sorted(strain_names - strain_ids.keys())
+            if missing:
+                rows = self.db.session.execute(
+                    insert(Strain).returning(
+                        Strain.id, Strain.name, sort_by_parameter_order=True
+                    ),
+                    [{"name": name} for name in missing],
+                )
+                strain_ids.update((name, strain_id) for strain_id, name in rows)
+
+        trays = [r for r in batch if r["tray"]]
+        if trays:
+            version = self.next_tray_version()
+            tray_ids = self.db.session.scalars(
+                insert(Tray).returning(Tray.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "room_id": room_ids[r["room"]],
+                        "name": r["tray"],
+                        "version": version,
+                        "planted_date": r["planted_date"],
+                        "harvest_date": r["harvest_date"],
+                    }
+                    for r in trays
+                ],
+            ).all()
+
+            light_rows = [
+                {"tray_id": tray_id, "width": r["width"], "height": r["height"]}
+                for tray_id, r in zip(tray_ids, trays)
+                for _ in range(r["lights"])
+            ]
+            light_ids = iter(
+                self.db.session.scalars(
+                    insert(Light).returning(Light.id, sort_by_parameter_order=True),
+                    light_rows,
+                ).all()
+                if light_rows
+                else []
+            )
+
+            # Strains are listed in pot order: light by light, column-major.
+            pot_rows = []
+            for r in trays:
+                per_light = r["width"] * r["height"]
+                strains = r["strains"] or [None] * (r["lights"] * per_light)
+                for i in range(r["lights"]):
+                    light_id = next(light_ids)
+                    pot_rows.extend(
+                        {
+                            "light_id": light_id,
+                            "position": position,
+                            "strain_id": strain_ids.get(name),
+                        }
+                        for position, name in enumerate(
+                            strains[i * per_light : (i + 1) * per_light]
+                        )
+                    )
+            if pot_rows:
+                self.db.session.execute(insert(Pot), pot_rows)
+            counts["trays"] += len(trays)
+            counts["pots"] += len(pot_rows)
+
+        self.bump_revisions(
+            "rooms", *dict.fromkeys(f"room:{room_ids[r['room']]}" for r in batch)
+        )
+        self.db.session.commit()
+
+    def iter_facility(self, batch_size: int = 2000) -> Iterator[dict]:
+        """Yield one export record per tray, and one per room without trays.
+
+        Every pot is read by a single query with ``yield_per`` and the rows are
+        grouped back into trays as they stream in, so only one tray is held in
+        memory at a time.
+        """
+        from sqlalchemy import select
+
+        from website.models import Light, Pot, Room, Strain, Tray
+
+        query = (
+            select(
+                Room.id.label("room_id"),
+                Room.name.label("room"),
+                Tray.id.label("tray_id"),
+                Tray.name.label("tray"),
+                Tray.planted_date,
+                Tray.harvest_date,
+                Light.id.label("light_id"),
+                Light.width,
+                Light.height,
+                Pot.id.label("pot_id"),
+                Strain.name.label("strain"),
+            )
+            .outerjoin(Tray, Tray.room_id == Room.id)
+            .outerjoin(Light, Light.tray_id == Tray.id)
+            .outerjoin(Pot, Pot.light_id == Light.id)
+            .outerjoin(Strain, Strain.id == Pot.strain_id)
+            .order_by(Room.id, Tray.id, Light.id, Pot.position)
+            .execution_options(yield_per=batch_size)
+        )
+        rows = self.db.session.execute(query)
+        for (_, tray_id), group in groupby(
+            rows, lambda row: (row.room_id, row.tray_id)
+        ):
+            tray_rows = list(group)
+            first = tray_rows[0]
+            if tray_id is None:
+                yield {"room": first.room, "tray": None}
+                continue
+
+            strains = [row.strain for row in tray_rows if row.pot_id is not None]
+            yield {
+                "room": first.room,
+                "tray": first.tray,
+                "lights": len({row.light_id for row in tray_rows} - {None}),
+                "width": first.width or 0,
+                "height": first.height or 0,
+                "planted_date": first.planted_date,
+                "harvest_date": first.harvest_date,
+                "strains": strains if any(strains) else [],
+            }
+
     # Database Management Methods
+    def configure_engine(self, app: Flask) -> None:
+        from sqlalchemy import event
+
+        with app.app_context():
+            if self.db.engine.dialect.name == "sqlite":
+                event.listen(
+                    self.db.engine, "connect", sqlite_pragma_listener(SQLITE_PRAGMAS)
+                )
+
     def create_tables(self, app: Flask) -> None:
         with app.app_context():
             self.db.create_all()
+            added = self._add_missing_columns()
+            if ("pots", "position") in added:
+                self._backfill_pot_positions()
+            # create_all skips tables that already exist, so indexes added to
+            # existing models are created here for databases made before them.
+            for table in self.db.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(self.db.engine, checkfirst=True)
+            self._seed_tray_versions()
+
+    def _seed_tray_versions(self) -> None:
+        # Databases made before the counter existed continue from the highest
+        # version already in use.
+        from sqlalchemy import func, select
+        from sqlalchemy.exc import IntegrityError
+
+        from website.models import Revision, Tray
+
+        if self.db.session.get(Revision, "tray_versions") is None:
+            highest = self.db.session.scalar(select(func.max(Tray.version)))
+            self.db.session.add(Revision("tray_versions", highest or 0))
+            try:
+                self.db.session.commit()
+            except IntegrityError:
+                # Another worker seeded it while starting at the same time.
+                self.db.session.rollback()
+
+    def _add_missing_columns(self) -> set[tuple[str, str]]:
+        # create_all never alters existing tables, so columns added to a model
+        # later (with a server default) are appended here.
+        from sqlalchemy import inspect, text
+
+        added = set()
+        inspector = inspect(self.db.engine)
+        with self.db.engine.begin() as conn:
+            for table in self.db.metadata.sorted_tables:
+                existing = {
+                    column["name"] for column in inspector.get_columns(table.name)
+                }
+                for column in table.columns:
+                    if column.name in existing or column.server_default is None:
+                        continue
+                    column_type = column.type.compile(self.db.engine.dialect)
+                    conn.execute(
+                        text(
+                            f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                            f"{column_type} DEFAULT {column.server_default.arg}"
+                        )
+                    )
+                    added.add((table.name, column.name))
+        return added
+
+    def _backfill_pot_positions(self) -> None:
+        # Before pots had a position, their order by id within a light was
+        # their cell.
+        from sqlalchemy import func, select, update
+
+        from website.models import Pot
+
+        ranked = select(
+            Pot.id,
+            (
+                func.row_number().over(partition_by=Pot.light_id, order_by=Pot.id) - 1
+            ).label("position"),
+        ).subquery()
+        self.db.session.execute(
+            update(Pot)
+            .where(Pot.id == ranked.c.id)
+            .values(position=ranked.c.position)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.session.commit()
 
     def drop_tables(self, app: Flask) -> None:
         with app.app_context():
@@ -323,3 +1082,5 @@ class DatabaseManager:
     def reset_database(self, app: Flask) -> None:
         self.drop_tables(app)
         self.create_tables(app)
+        self.user_cache.clear()
+        self._has_users = False
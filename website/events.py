@@ -0,0 +1,178 @@
+import json
+from abc import ABC, abstractmethod
+from queue import Empty, Full, Queue
+from threading import Lock
+from typing import Iterator
+
+from flask import Flask, current_app
+
+from website.config import EVENTS
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is optional
+    redis = None
+
+
+class Subscription(ABC):
+    @abstractmethod
+    def get(self, timeout: float) -> str | None: ...
+
+    @abstractmethod
+    def close(self) -> None: ...
+
+
+class MemoryBroker:
+    """Fans messages out to subscribers of the same process.
+
+    Each subscriber gets a bounded queue; messages for a subscriber that has
+    fallen that far behind are dropped rather than blocking the publisher.
+    """
+
+    def __init__(self, max_queue: int = 100) -> None:
+        self.max_queue = max_queue
+        self._lock = Lock()
+        self._channels: dict[str, set[Queue]] = {}
+
+    def publish(self, channel: str, message: str) -> None:
+        with self._lock:
+            queues = list(self._channels.get(channel, ()))
+        for queue in queues:
+            try:
+                queue.put_nowait(message)
+            except Full:
+                pass
+
+    def subscribe(self, channel: str) -> "MemorySubscription":
+        queue = Queue(self.max_queue)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(queue)
+        return MemorySubscription(self, channel, queue)
+
+    def unsubscribe(self, channel: str, queue: Queue) -> None:
+        with self._lock:
+            queues = self._channels.get(channel)
+            if queues is None:
+                return
+            queues.discard(queue)
+            if not queues:
+                del self._channels[channel]
+
+    def subscriber_count(self, channel: str) -> int:
+        with self._lock:
+            return len(self._channels.get(channel, ()))
+
+
+class MemorySubscription(Subscription):
+    def __init__(self, broker: MemoryBroker, channel: str, queue: Queue) -> None:
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue
+
+    def get(self, timeout: float) -> str | None:
+        try:
+            return self.queue.get(timeout=timeout)
+        except Empty:
+            return None
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self.channel, self.queue)
+
+
+class RedisBroker:
+    """Publishes through Redis pub/sub so every worker process sees each event."""
+
+    def __init__(self, url: str) -> None:
+        if redis is None:
+            raise RuntimeError("EVENTS_BACKEND=redis requires the redis package")
+        self.client = redis.Redis.from_url(url)
+
+    def publish(self, channel: str, message: str) -> None:
+        self.client.publish(channel, message)
+
+    def subscribe(self, channel: str) -> "RedisSubscription":
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel)
+        return RedisSubscription(pubsub)
+
+
+class RedisSubscription(Subscription):
+    def __init__(self, pubsub) -> None:
+        self.pubsub = pubsub
+
+    def get(self, timeout: float) -> str | None:
+        message = self.pubsub.get_message(timeout=timeout)
+        if message is None:
+            return None
+        return message["data"].decode()
+
+    def close(self) -> None:
+        self.pubsub.close()
+
+
+class RoomEvents:
+    """Publishes room changes and streams them to browsers as Server-Sent Events.
+
+    Every event carries the room revision it was published at as its SSE id,
+    so a client that reconnects with an older ``Last-Event-ID`` is told to
+    resync instead of silently missing changes.
+    """
+
+    def __init__(self, config: dict = EVENTS) -> None:
+        self.config = config
+        self.broker = MemoryBroker(config["MAX_QUEUE"])
+
+    def init_app(self, app: Flask) -> None:
+        if self.config["BACKEND"] == "redis":
+            self.broker = RedisBroker(self.config["URL"])
+        elif self.config["BACKEND"] != "memory":
+            raise ValueError(f"Unknown EVENTS_BACKEND {self.config['BACKEND']!r}")
+
+    @staticmethod
+    def channel(room_id: int) -> str:
+        return f"room:{room_id}"
+
+    def publish(self, room_id: int, type: str, revision: int, **data) -> None:
+        message = json.dumps({"type": type, "revision": revision, **data})
+        try:
+            self.broker.publish(self.channel(room_id), message)
+        except Exception as e:
+            # The change is already committed; a lost event only delays
+            # clients until their next resync.
+            current_app.logger.error(f"Error publishing room event: {e}")
+
+    def subscribe(self, room_id: int) -> Subscription:
+        return self.broker.subscribe(self.channel(room_id))
+
+    def stream(
+        self, subscription: Subscription, last_revision: int, revision: int
+    ) -> Iterator[str]:
+        """Yield SSE messages for ``subscription`` until the client goes away.
+
+        Subscribe before reading ``revision`` so no change can slip in between;
+        events at or below the revision the client already has are skipped.
+        """
+        try:
+            yield f"retry: {self.config['RETRY']}\n\n"
+            if last_revision != revision:
+                yield format_event("resync", {"revision": revision}, revision)
+
+            while True:
+                message = subscription.get(self.config["HEARTBEAT"])
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                event = json.loads(message)
+                if event["revision"] <= revision:
+                    continue
+                revision = event["revision"]
+                yield format_event(event["type"], event, revision)
+        finally:
+            subscription.close()
+
+
+def format_event(type: str, data: dict, id: int) -> str:
+    return f"id: {id}\nevent: {type}\ndata: {json.dumps(data)}\n\n"
+
+
+room_events = RoomEvents()
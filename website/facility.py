@@ -0,0 +1,273 @@
+"""Import and export whole facilities as CSV or JSON Lines.
+
+Both formats hold one record per tray with the same fields:
+
+    room,tray,lights,width,height,planted_date,harvest_date,strains
+
+``strains`` lists the strain of every pot in pot order (light by light,
+column-major within a light), separated by ``|`` in CSV and as a list with
+``null`` for empty pots in JSON Lines. It may be left empty for a tray with
+no strains. A record with only a room name creates an empty room.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import IO, Iterable, Iterator
+
+import click
+from flask.cli import AppGroup
+
+from website.config import FACILITY, MAX_TRAY_SIZES
+from website.database import Response
+
+FIELDS = [
+    "room",
+    "tray",
+    "lights",
+    "width",
+    "height",
+    "planted_date",
+    "harvest_date",
+    "strains",
+]
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+EXTENSIONS = {"csv": "csv", "jsonl": "jsonl", "ndjson": "jsonl"}
+MAX_ERRORS = 10
+
+
+class InvalidRecord(ValueError):
+    def __init__(self, line: int, message: str) -> None:
+        super().__init__(f"Line {line}: {message}")
+
+
+def read_csv(text: IO[str]) -> Iterator[tuple[int, dict]]:
+    reader = csv.DictReader(text)
+    if "room" not in (reader.fieldnames or []):
+        raise InvalidRecord(1, f"expected a header row with {','.join(FIELDS)}")
+    for row in reader:
+        strains = row.get("strains") or ""
+        row["strains"] = [name.strip() or None for name in strains.split("|")]
+        yield reader.line_num, row
+
+
+def read_jsonl(text: IO[str]) -> Iterator[tuple[int, dict]]:
+    for line, content in enumerate(text, 1):
+        if not content.strip():
+            continue
+        try:
+            row = json.loads(content)
+        except ValueError as e:
+            raise InvalidRecord(line, f"invalid JSON ({e})")
+        if not isinstance(row, dict):
+            raise InvalidRecord(line, "expected a JSON object")
+        yield line, row
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+
+
+def format_for(filename: str) -> str | None:
+    return EXTENSIONS.get(filename.rsplit(".", 1)[-1].lower())
+
+
+def read_records(stream: IO[bytes], format: str) -> Iterator[tuple[int, dict]]:
+    """Yield ``(line, raw record)`` pairs, reading from the start of ``stream``."""
+    stream.seek(0)
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        yield from READERS[format](text)
+    finally:
+        # Leave the underlying file open so it can be read a second time.
+        text.detach()
+
+
+def parse_size(row: dict, field: str, line: int) -> int:
+    try:
+        value = int(row.get(field) or 0)
+    except (TypeError, ValueError):
+        raise InvalidRecord(line, f"{field} must be a whole number")
+    if not 1 <= value <= MAX_TRAY_SIZES[field]:
+        raise InvalidRecord(
+            line, f"{field} must be between 1 and {MAX_TRAY_SIZES[field]}"
+        )
+    return value
+
+
+def parse_date(row: dict, field: str, line: int) -> datetime | None:
+    value = row.get(field)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        raise InvalidRecord(line, f"{field} must be an ISO date")
+
+
+def parse_record(row: dict, line: int) -> dict:
+    """Validate a raw record and normalise it the way the room forms do."""
+    room = str(row.get("room") or "").strip().upper()
+    if not room:
+        raise InvalidRecord(line, "room is required")
+    tray = str(row.get("tray") or "").strip().upper()
+    if not tray:
+        return {"room": room, "tray": None, "strains": []}
+
+    record = {
+        "room": room,
+        "tray": tray,
+        "lights": parse_size(row, "lights", line),
+        "width": parse_size(row, "width", line),
+        "height": parse_size(row, "height", line),
+        "planted_date": parse_date(row, "planted_date", line),
+        "harvest_date": parse_date(row, "harvest_date", line),
+    }
+
+    strains = row.get("strains") or []
+    if not isinstance(strains, list):
+        raise InvalidRecord(line, "strains must be a list")
+    strains = [(str(name).strip() or None) if name else None for name in strains]
+    if not any(strains):
+        strains = []
+    pots = record["lights"] * record["width"] * record["height"]
+    if strains and len(strains) != pots:
+        raise InvalidRecord(
+            line, f"expected {pots} strains, one per pot, got {len(strains)}"
+        )
+    if any(name and "|" in name for name in strains):
+        raise InvalidRecord(line, "strain names cannot contain '|'")
+    record["strains"] = strains
+    return record
+
+
+def check_records(stream: IO[bytes], format: str) -> list[str]:
+    """Return the problems that would stop an import, without writing anything.
+
+    Rooms must not exist yet, since ``Room.name`` is unique; strains that
+    already exist are reused, since ``Strain.name`` is unique as well.
+    """
+    from website import db_manager
+
+    errors: list[str] = []
+    room_lines: dict[str, int] = {}
+    try:
+        for line, row in read_records(stream, format):
+            try:
+                record = parse_record(row, line)
+            except InvalidRecord as e:
+                errors.append(str(e))
+                continue
+            room_lines.setdefault(record["room"], line)
+    except (InvalidRecord, csv.Error, UnicodeDecodeError) as e:
+        errors.append(str(e))
+
+    for name in sorted(
+        db_manager.get_existing_room_names(room_lines), key=room_lines.get
+    ):
+        errors.append(f"Line {room_lines[name]}: room {name} already exists")
+    return errors
+
+
+def load_facility(
+    stream: IO[bytes], format: str, batch_size: int = FACILITY["IMPORT_BATCH_SIZE"]
+) -> Response:
+    """Validate the whole file, then import it in batched transactions.
+
+    The file is read twice, once to validate and once to import, so a file
+    with any invalid record changes nothing and neither pass holds more than
+    a batch of records in memory.
+    """
+    from website import db_manager
+
+    errors = check_records(stream, format)
+    if errors:
+        message = "; ".join(errors[:MAX_ERRORS])
+        if len(errors) > MAX_ERRORS:
+            message += f" (and {len(errors) - MAX_ERRORS} more)"
+        return Response(type="danger", message=f"Import failed. {message}")
+
+    records = (parse_record(row, line) for line, row in read_records(stream, format))
+    return db_manager.import_facility(records, batch_size)
+
+
+def serialize(record: dict) -> dict:
+    return {
+        "room": record["room"],
+        "tray": record["tray"],
+        "lights": record.get("lights"),
+        "width": record.get("width"),
+        "height": record.get("height"),
+        "planted_date": isoformat(record.get("planted_date")),
+        "harvest_date": isoformat(record.get("harvest_date")),
+        "strains": record.get("strains", []),
+    }
+
+
+def isoformat(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def write_csv(records: Iterable[dict]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values: list) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(values)
+        return buffer.getvalue()
+
+    yield line(FIELDS)
+    for record in records:
+        row = serialize(record)
+        row["strains"] = "|".join(name or "" for name in row["strains"])
+        yield line(["" if row[field] is None else row[field] for field in FIELDS])
+
+
+def write_jsonl(records: Iterable[dict]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(serialize(record)) + "\n"
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
+
+
+def dump_facility(
+    format: str, batch_size: int = FACILITY["EXPORT_BATCH_SIZE"]
+) -> Iterator[str]:
+    """Stream every room and tray in ``format``, one record at a time."""
+    from website import db_manager
+
+    return WRITERS[format](db_manager.iter_facility(batch_size))
+
+
+facility_cli = AppGroup("facility", help="Import and export rooms and trays.")
+
+
+@facility_cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--format", type=click.Choice(list(FORMATS)), help="Default: by extension."
+)
+@click.option("--batch-size", default=FACILITY["IMPORT_BATCH_SIZE"], show_default=True)
+def import_command(path: str, format: str | None, batch_size: int) -> None:
+    """Create the rooms and trays described in a CSV or JSON Lines file."""
+    format = format or format_for(path)
+    if not format:
+        raise click.UsageError("Cannot tell the format from the extension")
+    with open(path, "rb") as f:
+        response = load_facility(f, format, batch_size)
+    if response.type != "success":
+        raise click.ClickException(response.message)
+    click.echo(response.message)
+
+
+@facility_cli.command("export")
+@click.argument("output", type=click.File("w"), default="-")
+@click.option("--format", type=click.Choice(list(FORMATS)), default="csv")
+@click.option("--batch-size", default=FACILITY["EXPORT_BATCH_SIZE"], show_default=True)
+def export_command(output: IO[str], format: str, batch_size: int) -> None:
+    """Write every room and tray as CSV or JSON Lines."""
+    for chunk in dump_facility(format, batch_size):
+        output.write(chunk)
@@ -0,0 +1,61 @@
+from typing import TYPE_CHECKING, Hashable
+
+from flask import jsonify, render_template, request
+from markupsafe import Markup
+from werkzeug import Response
+
+from website.config import FRAGMENT_CACHE
+from website.utils import TTLCache
+
+if TYPE_CHECKING:
+    from website.models import Tray
+
+
+class FragmentCache:
+    def __init__(self, max_size: int = 1024, ttl: float = 3600) -> None:
+        self.cache = TTLCache(max_size, ttl)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.cache
+
+    def render(self, template: str, key: Hashable, **context) -> Markup:
+        html = self.cache.get(key)
+        if html is None:
+            html = Markup(render_template(template, **context))
+            self.cache.set(key, html)
+        return html
+
+
+fragment_cache = FragmentCache(FRAGMENT_CACHE["MAX_SIZE"], FRAGMENT_CACHE["TTL"])
+
+
+def tray_grid_key(tray: "Tray") -> Hashable:
+    return ("tray_grid", tray.id, tray.version)
+
+
+def render_tray_grid(tray: "Tray") -> Markup:
+    return fragment_cache.render(
+        "room/partials/tray_grid.html", tray_grid_key(tray), tray=tray
+    )
+
+
+def wants_fragment() -> bool:
+    """Whether the request came from fragments.js rather than a plain form post."""
+    return request.headers.get("X-Fragment") == "1"
+
+
+def fragment_response(
+    action: str | None = None, target: str | None = None, html: str = ""
+) -> Response:
+    """Answer a fragment request in one round trip.
+
+    ``action`` tells the client what to do with ``html`` at the element whose
+    id is ``target`` (``replace``, ``append`` or ``remove``); the flashed
+    messages are rendered alongside so no follow-up page load is needed.
+    """
+    return jsonify(
+        action=action,
+        target=target,
+        html=html,
+        alerts=render_template("components/alerts.html"),
+    )
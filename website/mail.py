@@ -0,0 +1,183 @@
+import smtplib
+import ssl
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from threading import Event, Thread
+from typing import TYPE_CHECKING
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+
+from website.config import MAIL_CONFIG
+
+if TYPE_CHECKING:
+    from website.models import OutgoingMail
+
+# Relays on the same machine may not offer STARTTLS; anything else must.
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+class MailDispatcher:
+    """Sends queued mail from the outgoing_mails table on a background thread.
+
+    One authenticated SMTP connection is kept open and reused across
+    messages; failed deliveries are retried with exponential backoff.
+    """
+
+    def __init__(self, db: SQLAlchemy, config: dict = MAIL_CONFIG) -> None:
+        self.db = db
+        self.config = config
+        self.app: Flask | None = None
+        self.sent = 0
+        self.failed = 0
+        self._smtp: smtplib.SMTP | None = None
+        self._wake = Event()
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        if self.config["DISPATCHER"]:
+            self.start()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="mail-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        self._close()
+
+    def enqueue(self, recipient: str, subject: str, text: str, html: str) -> None:
+        from website.models import OutgoingMail
+
+        self.db.session.add(OutgoingMail(recipient, subject, text, html))
+        self.db.session.commit()
+        self._wake.set()
+
+    def queue_depth(self) -> int:
+        from website.models import OutgoingMail
+
+        return (
+            self.db.session.query(OutgoingMail)
+            .filter(OutgoingMail.attempts < self.config["MAX_ATTEMPTS"])
+            .count()
+        )
+
+    def run_once(self) -> int:
+        """Deliver every due message and return how many were sent."""
+        from website.models import OutgoingMail
+
+        now = datetime.now()
+        due = (
+            self.db.session.query(OutgoingMail)
+            .filter(
+                OutgoingMail.next_attempt_at <= now,
+                OutgoingMail.attempts < self.config["MAX_ATTEMPTS"],
+            )
+            .order_by(OutgoingMail.id)
+            .all()
+        )
+
+        sent = 0
+        for mail in due:
+            if not self._claim(mail, now):
+                continue
+            try:
+                self._send(mail)
+            except Exception as e:
+                self._close()
+                mail.attempts += 1
+                mail.last_error = str(e)
+                mail.next_attempt_at = datetime.now() + timedelta(
+                    seconds=self.config["RETRY_BACKOFF"] * 2 ** (mail.attempts - 1)
+                )
+                self.failed += 1
+            else:
+                self.db.session.delete(mail)
+                self.sent += 1
+                sent += 1
+            self.db.session.commit()
+        return sent
+
+    def _claim(self, mail: "OutgoingMail", now: datetime) -> bool:
+        # Push next_attempt_at forward as a lease so that dispatchers running
+        # in other worker processes skip this message while it is in flight.
+        from sqlalchemy import update
+
+        from website.models import OutgoingMail
+
+        lease = now + timedelta(seconds=self.config["LEASE"])
+        claimed = self.db.session.execute(
+            update(OutgoingMail)
+            .where(
+                OutgoingMail.id == mail.id,
+                OutgoingMail.next_attempt_at == mail.next_attempt_at,
+            )
+            .values(next_attempt_at=lease)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.session.commit()
+        return claimed == 1
+
+    def _send(self, mail: "OutgoingMail") -> None:
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = mail.subject
+        msg["From"] = self.config["AUTHOR"] + " <" + self.config["SENDER"] + ">"
+        msg["To"] = mail.recipient
+        msg.attach(MIMEText(mail.text, "plain"))
+        msg.attach(MIMEText(mail.html, "html"))
+
+        sender = self.config["USERNAME"] or self.config["SENDER"]
+        self._connection().sendmail(sender, [mail.recipient], msg.as_string())
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close()
+
+        smtp_class = smtplib.SMTP_SSL if self.config["USE_SSL"] else smtplib.SMTP
+        smtp = smtp_class(self.config["SERVER"], self.config["PORT"])
+        try:
+            if not self.config["USE_SSL"] and self.config["SERVER"] not in LOCAL_HOSTS:
+                smtp.starttls(context=ssl.create_default_context())
+            if self.config["USERNAME"]:
+                smtp.login(self.config["USERNAME"], self.config["PASSWORD"])
+        except BaseException:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        return smtp
+
+    def _close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
+
+    def _run(self) -> None:
+        assert self.app is not None
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    self.db.session.rollback()
+                    self.app.logger.error(f"Mail dispatcher error: {e}")
+            self._wake.wait(self.config["POLL_INTERVAL"])
+            self._wake.clear()
+        self._close()
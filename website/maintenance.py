@@ -0,0 +1,64 @@
+from threading import Event, Thread
+
+import click
+from flask import Flask
+
+from website.config import TOKEN_SWEEPER
+from website.database import DatabaseManager
+
+
+class TokenSweeper:
+    """Periodically purges used and expired password reset tokens."""
+
+    def __init__(self, db_manager: DatabaseManager, config: dict = TOKEN_SWEEPER):
+        self.db_manager = db_manager
+        self.config = config
+        self.app: Flask | None = None
+        self.last_purged = 0
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        app.cli.add_command(purge_tokens_command)
+        if self.config["ENABLED"]:
+            self.start()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="token-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def run_once(self) -> int:
+        self.last_purged = self.db_manager.purge_reset_tokens(self.config["BATCH_SIZE"])
+        return self.last_purged
+
+    def _run(self) -> None:
+        assert self.app is not None
+        while not self._stop.wait(self.config["INTERVAL"]):
+            with self.app.app_context():
+                try:
+                    if self.run_once():
+                        self.app.logger.info(
+                            f"Purged {self.last_purged} password reset tokens"
+                        )
+                except Exception as e:
+                    self.db_manager.db.session.rollback()
+                    self.app.logger.error(f"Token sweeper error: {e}")
+
+
+@click.command("purge-tokens")
+@click.option("--batch-size", default=TOKEN_SWEEPER["BATCH_SIZE"], show_default=True)
+def purge_tokens_command(batch_size: int) -> None:
+    """Delete used and expired password reset tokens."""
+    from website import db_manager
+
+    purged = db_manager.purge_reset_tokens(batch_size)
+    click.echo(f"Purged {purged} password reset tokens")
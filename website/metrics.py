@@ -0,0 +1,337 @@
+import json
+import mmap
+import os
+import struct
+import time
+from threading import Lock
+from typing import Callable, Iterator
+
+from flask import Flask, g, has_request_context, request
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from werkzeug import Response
+
+from website.config import METRICS
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# name: (type, help, histogram buckets). Gauges are written by each worker
+# for itself and summed over the workers that are still alive.
+DEFINITIONS: dict[str, tuple[str, str, tuple[float, ...]]] = {
+    "hubsync_request_duration_seconds": (
+        "histogram",
+        "Request latency by blueprint and endpoint.",
+        REQUEST_BUCKETS,
+    ),
+    "hubsync_db_queries_total": (
+        "counter",
+        "SQL statements executed, by blueprint and endpoint.",
+        (),
+    ),
+    "hubsync_password_hash_seconds": (
+        "histogram",
+        "Password hash and verify duration, including time queued.",
+        HASH_BUCKETS,
+    ),
+    "hubsync_cache_requests_total": (
+        "counter",
+        "In-process cache lookups by cache and result.",
+        (),
+    ),
+    "hubsync_db_pool_connections": (
+        "gauge",
+        "Database pool connections by state.",
+        (),
+    ),
+}
+
+
+class MmapValues:
+    """Float values keyed by string in a memory-mapped file.
+
+    Each process writes only its own file, so no locking between processes
+    is needed; readers in other processes see every entry up to the used
+    size stored in the first eight bytes, which is updated last.
+    """
+
+    INITIAL_SIZE = 64 * 1024
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = Lock()
+        self._positions: dict[str, int] = {}
+        self._file = open(path, "a+b")
+        if os.path.getsize(path) == 0:
+            self._file.truncate(self.INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        # A file left by an earlier process with the same pid is continued.
+        self._used = max(struct.unpack_from("Q", self._map, 0)[0], 8)
+        struct.pack_into("Q", self._map, 0, self._used)
+        for key, _, position in self._entries(self._map, self._used):
+            self._positions[key] = position
+
+    @staticmethod
+    def _entries(data, used: int) -> Iterator[tuple[str, float, int]]:
+        offset = 8
+        while offset < used:
+            length = struct.unpack_from("i", data, offset)[0]
+            key = bytes(data[offset + 4 : offset + 4 + length]).decode()
+            offset += 4 + length + (-(4 + length) % 8)
+            yield key, struct.unpack_from("d", data, offset)[0], offset
+            offset += 8
+
+    @classmethod
+    def read(cls, path: str) -> Iterator[tuple[str, float]]:
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < 8:
+            return
+        used = struct.unpack_from("Q", data, 0)[0]
+        for key, value, _ in cls._entries(data, used):
+            yield key, value
+
+    def _position(self, key: str) -> int:
+        position = self._positions.get(key)
+        if position is not None:
+            return position
+
+        encoded = key.encode()
+        padding = -(4 + len(encoded)) % 8
+        size = 4 + len(encoded) + padding + 8
+        while self._used + size > len(self._map):
+            new_size = len(self._map) * 2
+            self._map.close()
+            self._file.truncate(new_size)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+
+        offset = self._used
+        struct.pack_into(f"i{len(encoded)}s", self._map, offset, len(encoded), encoded)
+        position = offset + 4 + len(encoded) + padding
+        struct.pack_into("d", self._map, position, 0.0)
+        self._used += size
+        struct.pack_into("Q", self._map, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def inc(self, key: str, amount: float) -> None:
+        with self._lock:
+            position = self._position(key)
+            value = struct.unpack_from("d", self._map, position)[0]
+            struct.pack_into("d", self._map, position, value + amount)
+
+    def set(self, key: str, value: float) -> None:
+        with self._lock:
+            struct.pack_into("d", self._map, self._position(key), value)
+
+
+def metric_key(name: str, labels: dict[str, str]) -> str:
+    return json.dumps([name, sorted(labels.items())])
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class Metrics:
+    """Prometheus-style metrics shared by every worker through METRICS_DIR.
+
+    Each worker process appends to its own ``<pid>.db`` file and a scrape sums
+    all of them, so totals cover every gunicorn worker. Point METRICS_DIR at
+    a directory that is emptied on deploy.
+    """
+
+    def __init__(self, config: dict = METRICS) -> None:
+        self.config = config
+        self.directory: str | None = None
+        self.gauges: dict[str, tuple[str, Callable[[], float]]] = {}
+        self._engine = None
+        self._values: MmapValues | None = None
+        self._pid: int | None = None
+        self._lock = Lock()
+
+    def init_app(self, app: Flask, db: SQLAlchemy) -> None:
+        if not self.config["ENABLED"]:
+            return
+
+        self.directory = self.config["DIR"] or os.path.join(
+            app.instance_path, "metrics"
+        )
+        os.makedirs(self.directory, exist_ok=True)
+
+        with app.app_context():
+            self._engine = db.engine
+            event.listen(self._engine, "before_cursor_execute", self._count_query)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def register_gauge(self, name: str, help: str, fn: Callable[[], float]) -> None:
+        """Add a gauge computed when metrics are scraped, such as a queue depth."""
+        self.gauges[name] = (help, fn)
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def values(self) -> MmapValues:
+        # Reopen after a fork so every worker writes to a file of its own.
+        with self._lock:
+            if self._values is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._values = MmapValues(
+                    os.path.join(self.directory, f"{self._pid}.db")  # type: ignore
+                )
+            return self._values
+
+    def inc(self, name: str, labels: dict[str, str], amount: float = 1) -> None:
+        if self.enabled:
+            self.values().inc(metric_key(name, labels), amount)
+
+    def set(self, name: str, labels: dict[str, str], value: float) -> None:
+        if self.enabled:
+            self.values().set(metric_key(name, labels), value)
+
+    def observe(self, name: str, labels: dict[str, str], value: float) -> None:
+        if not self.enabled:
+            return
+        values = self.values()
+        for bound in DEFINITIONS[name][2]:
+            if value <= bound:
+                bucket = dict(labels, le=str(bound))
+                values.inc(metric_key(f"{name}_bucket", bucket), 1)
+        values.inc(metric_key(f"{name}_bucket", dict(labels, le="+Inf")), 1)
+        values.inc(metric_key(f"{name}_sum", labels), value)
+        values.inc(metric_key(f"{name}_count", labels), 1)
+
+    def _request_labels(self) -> dict[str, str]:
+        return {
+            "blueprint": request.blueprint or "",
+            "endpoint": request.endpoint or "",
+        }
+
+    def _count_query(self, conn, cursor, statement, parameters, context, many):
+        if has_request_context():
+            self.inc("hubsync_db_queries_total", self._request_labels())
+
+    def _start(self) -> None:
+        g._metrics_started = time.perf_counter()
+
+    def _finish(self, response: Response) -> Response:
+        started = g.pop("_metrics_started", None)
+        if started is not None:
+            labels = dict(self._request_labels(), method=request.method)
+            self.observe(
+                "hubsync_request_duration_seconds",
+                labels,
+                time.perf_counter() - started,
+            )
+        self._record_process_state()
+        return response
+
+    def _record_process_state(self) -> None:
+        from website import db_manager
+        from website.fragments import fragment_cache
+
+        for cache, ttl_cache in (
+            ("user", db_manager.user_cache),
+            ("fragment", fragment_cache.cache),
+        ):
+            for result in ("hit", "miss"):
+                self.set(
+                    "hubsync_cache_requests_total",
+                    {"cache": cache, "result": result},
+                    ttl_cache.hits if result == "hit" else ttl_cache.misses,
+                )
+
+        if self._engine is None:
+            return
+        pool = self._engine.pool
+        for state, count in (
+            ("checked_out", getattr(pool, "checkedout", lambda: 0)()),
+            ("checked_in", getattr(pool, "checkedin", lambda: 0)()),
+            ("overflow", max(getattr(pool, "overflow", lambda: 0)(), 0)),
+        ):
+            self.set("hubsync_db_pool_connections", {"state": state}, count)
+
+    def collect(self) -> dict[str, float]:
+        """Sum the values of every worker, skipping gauges of dead ones."""
+        totals: dict[str, float] = {}
+        for filename in os.listdir(self.directory):  # type: ignore
+            pid, extension = os.path.splitext(filename)
+            if extension != ".db" or not pid.isdigit():
+                continue
+            alive = pid_alive(int(pid))
+            path = os.path.join(self.directory, filename)  # type: ignore
+            for key, value in MmapValues.read(path):
+                name = json.loads(key)[0]
+                if DEFINITIONS.get(name, ("",))[0] == "gauge" and not alive:
+                    continue
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        samples: dict[str, list[tuple[str, list, float]]] = {}
+        for key, value in self.collect().items():
+            sample_name, labels = json.loads(key)
+            base = sample_name
+            for suffix in ("_bucket", "_sum", "_count"):
+                if sample_name.removesuffix(suffix) in DEFINITIONS:
+                    base = sample_name.removesuffix(suffix)
+            if base not in DEFINITIONS:
+                continue
+            samples.setdefault(base, []).append((sample_name, labels, value))
+
+        lines = []
+        for name in sorted(samples):
+            kind, help, _ = DEFINITIONS[name]
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in sorted(samples[name], key=sort_key):
+                lines.append(f"{sample_name}{format_labels(labels)} {value:g}")
+        lines.extend(self._hit_ratios(samples))
+        for name, (help, fn) in sorted(self.gauges.items()):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {fn():g}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _hit_ratios(samples: dict) -> list[str]:
+        counts: dict[str, dict[str, float]] = {}
+        for _, labels, value in samples.get("hubsync_cache_requests_total", []):
+            labels = dict(labels)
+            counts.setdefault(labels["cache"], {})[labels["result"]] = value
+
+        lines = [
+            "# HELP hubsync_cache_hit_ratio Cache hits over lookups, across workers.",
+            "# TYPE hubsync_cache_hit_ratio gauge",
+        ]
+        for cache, results in sorted(counts.items()):
+            lookups = results.get("hit", 0) + results.get("miss", 0)
+            ratio = results.get("hit", 0) / lookups if lookups else 0
+            lines.append(f'hubsync_cache_hit_ratio{{cache="{cache}"}} {ratio:g}')
+        return lines
+
+
+def sort_key(sample: tuple[str, list, float]):
+    name, labels, _ = sample
+    le = dict(labels).get("le")
+    bound = float("inf") if le == "+Inf" else float(le) if le else 0
+    return ([item for item in labels if item[0] != "le"], name, bound)
+
+
+def format_labels(labels: list) -> str:
+    if not labels:
+        return ""
+    pairs = (f"{name}={json.dumps(str(value))}" for name, value in labels)
+    return "{" + ",".join(pairs) + "}"
+
+
+metrics = Metrics()
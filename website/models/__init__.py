@@ -1,3 +1,6 @@
+from .outgoing_mail import OutgoingMail
 from .password_reset_token import PasswordResetToken
+from .revision import Revision
 from .room import Light, Pot, Room, Strain, Tray
+from .tray_grid import GridCell, TrayGrid
 from .user import User
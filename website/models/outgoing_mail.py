@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Mapped, mapped_column
+
+from website import db
+
+
+class OutgoingMail(db.Model):
+    __tablename__ = "outgoing_mails"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    recipient: Mapped[str] = mapped_column()
+    subject: Mapped[str] = mapped_column()
+    text: Mapped[str] = mapped_column()
+    html: Mapped[str] = mapped_column()
+    attempts: Mapped[int] = mapped_column()
+    next_attempt_at: Mapped[datetime] = mapped_column()
+    last_error: Mapped[str | None] = mapped_column()
+
+    def __init__(self, recipient: str, subject: str, text: str, html: str) -> None:
+        super().__init__()
+        self.recipient = recipient
+        self.subject = subject
+        self.text = text
+        self.html = html
+        self.attempts = 0
+        self.next_attempt_at = datetime.now()
@@ -11,9 +11,9 @@ class PasswordResetToken(db.Model):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     token: Mapped[str] = mapped_column(unique=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
-    expires_at: Mapped[datetime] = mapped_column()
-    used: Mapped[bool] = mapped_column()
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    expires_at: Mapped[datetime] = mapped_column(index=True)
+    used: Mapped[bool] = mapped_column(index=True)
 
     def __init__(self, token: str, user_id: int, expires_in_minutes: int = 30) -> None:
         self.token = token
@@ -0,0 +1,15 @@
+from sqlalchemy.orm import Mapped, mapped_column
+
+from website import db
+
+
+class Revision(db.Model):
+    __tablename__ = "revisions"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    value: Mapped[int] = mapped_column()
+
+    def __init__(self, name: str, value: int = 1) -> None:
+        super().__init__()
+        self.name = name
+        self.value = value
@@ -1,10 +1,14 @@
 from datetime import datetime
+from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from website import db
 
+if TYPE_CHECKING:
+    from .tray_grid import TrayGrid
+
 
 class Strain(db.Model):
     __tablename__ = "strains"
@@ -24,15 +28,21 @@ class Strain(db.Model):
 
 class Pot(db.Model):
     __tablename__ = "pots"
+    __table_args__ = (Index("ix_pots_light_id_position", "light_id", "position"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     light_id: Mapped[int] = mapped_column(ForeignKey("lights.id"))
-    strain_id: Mapped[int] = mapped_column(ForeignKey("strains.id"), nullable=True)
+    # Cell within the light, column-major: col * light.height + row.
+    position: Mapped[int] = mapped_column(default=0, server_default="0")
+    strain_id: Mapped[int] = mapped_column(
+        ForeignKey("strains.id"), nullable=True, index=True
+    )
     strain: Mapped[Strain] = relationship(cascade="save-update")
 
-    def __init__(self, light_id: int) -> None:
+    def __init__(self, light_id: int, position: int = 0) -> None:
         super().__init__()
         self.light_id = light_id
+        self.position = position
 
     @property
     def is_on(self) -> bool:
@@ -41,12 +51,15 @@ class Pot(db.Model):
 
 class Light(db.Model):
     __tablename__ = "lights"
+    __table_args__ = (Index("ix_lights_tray_id_id", "tray_id", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     tray_id: Mapped[int] = mapped_column(ForeignKey("trays.id"))
     width: Mapped[int] = mapped_column()
     height: Mapped[int] = mapped_column()
-    pots: Mapped[list[Pot]] = relationship(cascade="all, delete-orphan")
+    pots: Mapped[list[Pot]] = relationship(
+        cascade="all, delete-orphan", order_by="Pot.position"
+    )
 
     def __init__(self, tray_id: int, width: int, height: int, pots: list[Pot]) -> None:
         super().__init__()
@@ -58,24 +71,28 @@ class Light(db.Model):
 
 class Tray(db.Model):
     __tablename__ = "trays"
+    __table_args__ = (Index("ix_trays_room_id_id", "room_id", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id"))
     name: Mapped[str] = mapped_column()
     planted_date: Mapped[datetime | None] = mapped_column()
     harvest_date: Mapped[datetime | None] = mapped_column()
-    lights: Mapped[list[Light]] = relationship(cascade="all, delete-orphan")
+    version: Mapped[int] = mapped_column(default=0, server_default="0")
+    lights: Mapped[list[Light]] = relationship(
+        cascade="all, delete-orphan", order_by="Light.id"
+    )
 
-    def __init__(
-        self, room_id: int, name: str, num_of_lights: int, width: int, height: int
-    ) -> None:
+    def __init__(self, room_id: int, name: str) -> None:
         super().__init__()
         self.room_id = room_id
         self.name = name
-        self.lights = [
-            Light(self.id, width, height, [Pot(i + 1) for _ in range(width * height)])
-            for i in range(num_of_lights)
-        ]
+
+    @property
+    def grid(self) -> "TrayGrid":
+        from .tray_grid import TrayGrid
+
+        return TrayGrid.from_tray(self)
 
     @property
     def is_planted(self) -> bool:
@@ -93,24 +110,15 @@ class Tray(db.Model):
             return 0
         return (self.harvest_date - datetime.now()).days
 
-    def add_lights(self, ammount: int, width: int, height: int) -> None:
-        for light in range(ammount):
-            self.lights.append(
-                Light(
-                    self.id,
-                    width,
-                    height,
-                    [Pot(light + 1) for j in range(width * height)],
-                )
-            )
-
 
 class Room(db.Model):
     __tablename__ = "rooms"
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(unique=True)
-    trays: Mapped[list[Tray]] = relationship(cascade="all, delete-orphan")
+    trays: Mapped[list[Tray]] = relationship(
+        cascade="all, delete-orphan", order_by="Tray.id"
+    )
 
     def __init__(self, name: str) -> None:
         super().__init__()
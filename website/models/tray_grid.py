@@ -0,0 +1,87 @@
+from array import array
+from typing import TYPE_CHECKING, Iterator, NamedTuple
+
+if TYPE_CHECKING:
+    from .room import Tray
+
+
+class GridCell(NamedTuple):
+    number: int
+    pot_id: int
+    strain_id: int | None
+
+
+class TrayGrid:
+    """Row-major pot layout of a tray, flattened across its lights.
+
+    Pots are stored column-major within a tray (the first ``rows`` pots fill
+    the first column, and so on), so the grid is built once here instead of
+    recomputing ``col * rows + row`` for every cell in the template.
+    """
+
+    __slots__ = ("tray_id", "rows", "cols", "pot_ids", "strain_ids", "strains")
+
+    def __init__(
+        self,
+        tray_id: int,
+        rows: int,
+        cols: int,
+        pot_ids: array,
+        strain_ids: array,
+        strains: dict[int, tuple[str, str]],
+    ) -> None:
+        self.tray_id = tray_id
+        self.rows = rows
+        self.cols = cols
+        self.pot_ids = pot_ids
+        self.strain_ids = strain_ids
+        self.strains = strains
+
+    @classmethod
+    def from_tray(cls, tray: "Tray") -> "TrayGrid":
+        pots = [pot for light in tray.lights for pot in light.pots]
+        rows = tray.lights[0].height if tray.lights else 0
+        cols = sum(light.width for light in tray.lights)
+
+        pot_ids = array("q", bytes(8 * rows * cols))
+        strain_ids = array("q", bytes(8 * rows * cols))
+        strains: dict[int, tuple[str, str]] = {}
+        for idx, pot in enumerate(pots[: rows * cols]):
+            col, row = divmod(idx, rows)
+            pot_ids[row * cols + col] = pot.id
+            if pot.strain_id:
+                strain_ids[row * cols + col] = pot.strain_id
+                if pot.strain_id not in strains:
+                    strains[pot.strain_id] = (pot.strain.name, pot.strain.initials)
+        return cls(tray.id, rows, cols, pot_ids, strain_ids, strains)
+
+    @property
+    def pot_count(self) -> int:
+        return sum(1 for pot_id in self.pot_ids if pot_id)
+
+    def iter_rows(self) -> Iterator[list[GridCell]]:
+        for row in range(self.rows):
+            start = row * self.cols
+            yield [
+                GridCell(col * self.rows + row + 1, pot_id, strain_id or None)
+                for col, (pot_id, strain_id) in enumerate(
+                    zip(
+                        self.pot_ids[start : start + self.cols],
+                        self.strain_ids[start : start + self.cols],
+                    )
+                )
+                if pot_id
+            ]
+
+    def to_dict(self) -> dict:
+        return {
+            "tray_id": self.tray_id,
+            "rows": self.rows,
+            "cols": self.cols,
+            "pot_ids": self.pot_ids.tolist(),
+            "strain_ids": self.strain_ids.tolist(),
+            "strains": {
+                strain_id: {"name": name, "initials": initials}
+                for strain_id, (name, initials) in self.strains.items()
+            },
+        }
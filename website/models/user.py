@@ -1,9 +1,8 @@
 from flask_login import UserMixin
 from sqlalchemy.orm import Mapped, mapped_column
-from werkzeug.security import generate_password_hash
 
 from website import db
-from website.utils import Role
+from website.utils import Role, password_hasher
 
 
 class User(db.Model, UserMixin):
@@ -28,7 +27,7 @@ class User(db.Model, UserMixin):
         self.display_name = display_name
         self.email = email
         self.username = username
-        self.password = generate_password_hash(password)
+        self.password = password_hasher.hash(password)
         self.role = role
 
     def is_admin(self) -> bool:
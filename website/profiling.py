@@ -0,0 +1,163 @@
+import heapq
+import json
+import logging
+import re
+import time
+
+from flask import (
+    Flask,
+    before_render_template,
+    g,
+    has_request_context,
+    request,
+    template_rendered,
+)
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from werkzeug import Response
+
+from website.config import PROFILER
+
+
+class RequestStats:
+    def __init__(self, max_statements: int) -> None:
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.max_statements = max_statements
+        self.slowest: list[tuple[float, str]] = []
+        self._render_depth = 0
+        self._render_started = 0.0
+
+    def add_query(self, statement: str, elapsed: float) -> None:
+        self.queries += 1
+        self.sql_time += elapsed
+        entry = (elapsed, statement)
+        if len(self.slowest) < self.max_statements:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+
+    def render_started(self) -> None:
+        # Templates rendered from inside another one (partials, cached
+        # fragments) are already covered by the outer render.
+        if self._render_depth == 0:
+            self._render_started = time.perf_counter()
+        self._render_depth += 1
+
+    def render_finished(self) -> None:
+        self._render_depth -= 1
+        if self._render_depth == 0:
+            self.render_time += time.perf_counter() - self._render_started
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+class RequestProfiler:
+    """Opt-in per-request SQL and template timing.
+
+    Adds a ``Server-Timing`` header to every response and writes requests
+    slower than ``SLOW_REQUEST_MS``, or issuing more than ``MAX_QUERIES``
+    statements, as JSON lines to the ``website.slow_requests`` logger.
+    """
+
+    def __init__(self, db: SQLAlchemy, config: dict = PROFILER) -> None:
+        self.db = db
+        self.config = config
+        self.logger = logging.getLogger("website.slow_requests")
+
+    def init_app(self, app: Flask) -> None:
+        if not self.config["ENABLED"]:
+            return
+
+        if self.config["LOG_FILE"]:
+            handler = logging.FileHandler(self.config["LOG_FILE"])
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.logger.addHandler(handler)
+        self.logger.setLevel(logging.INFO)
+
+        with app.app_context():
+            event.listen(self.db.engine, "before_cursor_execute", self._before_execute)
+            event.listen(self.db.engine, "after_cursor_execute", self._after_execute)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    @staticmethod
+    def _stats() -> RequestStats | None:
+        # Background threads (mail, token sweeper) run queries outside of a
+        # request and are not profiled.
+        if not has_request_context():
+            return None
+        return g.get("_request_stats")
+
+    def _start(self) -> None:
+        g._request_stats = RequestStats(self.config["SLOWEST_STATEMENTS"])
+
+    # The start time lives on the statement's execution context rather than
+    # the pooled connection, since after_cursor_execute never fires for a
+    # statement that raises and would leave a stale entry behind.
+    def _before_execute(self, conn, cursor, statement, parameters, context, many):
+        if context is not None:
+            context._profiler_started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, many):
+        started = getattr(context, "_profiler_started", None)
+        stats = self._stats()
+        if started is not None and stats is not None:
+            stats.add_query(statement, time.perf_counter() - started)
+
+    def _before_render(self, app: Flask, template, context) -> None:
+        stats = self._stats()
+        if stats is not None:
+            stats.render_started()
+
+    def _after_render(self, app: Flask, template, context) -> None:
+        stats = self._stats()
+        if stats is not None:
+            stats.render_finished()
+
+    def _finish(self, response: Response) -> Response:
+        stats = self._stats()
+        if stats is None:
+            return response
+
+        total = stats.elapsed
+        response.headers["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={stats.sql_time * 1000:.1f};desc="{stats.queries} queries"',
+                f"render;dur={stats.render_time * 1000:.1f}",
+                f"total;dur={total * 1000:.1f}",
+            ]
+        )
+
+        too_slow = total * 1000 >= self.config["SLOW_REQUEST_MS"]
+        too_many = stats.queries > self.config["MAX_QUERIES"]
+        if too_slow or too_many:
+            self.logger.warning(json.dumps(self._record(stats, total, response)))
+        return response
+
+    def _record(self, stats: RequestStats, total: float, response: Response) -> dict:
+        return {
+            "endpoint": request.endpoint,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(total * 1000, 1),
+            "queries": stats.queries,
+            "sql_ms": round(stats.sql_time * 1000, 1),
+            "render_ms": round(stats.render_time * 1000, 1),
+            "slowest_statements": [
+                {"ms": round(elapsed * 1000, 2), "statement": compact(statement)}
+                for elapsed, statement in sorted(stats.slowest, reverse=True)
+            ],
+        }
+
+
+def compact(statement: str, limit: int = 300) -> str:
+    statement = re.sub(r"\s+", " ", statement).strip()
+    return statement if len(statement) <= limit else statement[: limit - 3] + "..."
@@ -1,4 +1,6 @@
 from .admin import admin
+from .api import api
+from .assets import assets
 from .auth import auth
 from .main import main
 from .room import room
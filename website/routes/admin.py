@@ -1,21 +1,40 @@
 from typing import cast
 
 from flask import Blueprint as _Blueprint
-from flask import flash, redirect, render_template, request, url_for
+from flask import abort, flash, redirect, render_template, request, url_for
 from flask_login import login_required
 from werkzeug import Response
 
-from website.utils import admin_only, superadmin_only
+from website.utils import (
+    PasswordHasherBusy,
+    admin_only,
+    conditional_get,
+    superadmin_only,
+)
 
 admin = _Blueprint("admin", __name__)
 
 from website import db_manager
+from website.database import BUSY_MESSAGE
+from website.fragments import fragment_response, wants_fragment
 from website.utils import Role
 
+MEMBER_MODALS = {
+    "edit": "admin/partials/edit_member.html",
+    "delete": "admin/partials/delete_member.html",
+}
+
+
+def render_member_row(user_id: int) -> str:
+    return render_template(
+        "admin/partials/member_row.html", member=db_manager.get_user_by_id(user_id)
+    )
+
 
 @admin.route("/staff", methods=["GET", "POST"])
 @login_required
 @admin_only
+@conditional_get()
 def staff() -> Response | str:
     from website.models import User
 
@@ -32,11 +51,35 @@ def staff() -> Response | str:
         elif db_manager.get_user_by_username(username):
             flash("Username already in use.", "danger")
         else:
-            db_manager.create_user(name, email, username, "carefree", selected_role)
-            flash(f"User {name} created with default password 'carefree'", "success")
+            try:
+                user = db_manager.create_user(
+                    name, email, username, "carefree", selected_role
+                )
+            except PasswordHasherBusy:
+                flash(BUSY_MESSAGE, "warning")
+            else:
+                flash(
+                    f"User {name} created with default password 'carefree'", "success"
+                )
+                if wants_fragment():
+                    return fragment_response(
+                        "append", "staff-list", render_member_row(user.id)
+                    )
+        if wants_fragment():
+            return fragment_response()
     return render_template("admin/staff.html", staff=User.query.all())
 
 
+@admin.route("/staff/<int:user_id>/modals/<any(edit, delete):name>")
+@login_required
+@admin_only
+def member_modal(user_id: int, name: str) -> str:
+    member = db_manager.get_user_by_id(user_id)
+    if not member:
+        abort(404)
+    return render_template(MEMBER_MODALS[name], member=member)
+
+
 @admin.route("/staff/edit/<int:user_id>", methods=["POST"])
 @login_required
 @admin_only
@@ -52,6 +95,12 @@ def edit_staff_member(user_id: int) -> Response:
         user_id, name, email, username, selected_role
     )
     flash(response.message, response.type)
+    if wants_fragment():
+        if response.type != "success":
+            return fragment_response()
+        return fragment_response(
+            "replace", f"member{user_id}", render_member_row(user_id)
+        )
     return redirect(url_for("admin.staff"))
 
 
@@ -61,6 +110,10 @@ def edit_staff_member(user_id: int) -> Response:
 def delete_staff_member(user_id: int) -> Response:
     response = db_manager.delete_user(user_id)
     flash(response.message, response.type)
+    if wants_fragment():
+        if response.type != "success":
+            return fragment_response()
+        return fragment_response("remove", f"member{user_id}")
     return redirect(url_for("admin.staff"))
 
 
@@ -69,3 +122,14 @@ def delete_staff_member(user_id: int) -> Response:
 @superadmin_only
 def invox() -> str:
     return render_template("admin/invox.html")
+
+
+@admin.route("/metrics")
+@login_required
+@superadmin_only
+def metrics_endpoint() -> Response:
+    from website.metrics import metrics
+
+    if not metrics.enabled:
+        abort(404)
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,243 @@
+from datetime import datetime
+from functools import wraps
+from typing import TYPE_CHECKING, cast
+
+from flask import Blueprint as _Blueprint
+from flask import jsonify, request
+from flask_login import current_user, login_required
+
+from website import db_manager
+from website.config import MAX_TRAY_SIZES
+from website.database import Response, RoomSummary
+
+if TYPE_CHECKING:
+    from website.models import Tray
+
+api = _Blueprint("api", __name__)
+
+
+def api_role_required(*roles: str):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if current_user.role not in roles:
+                return jsonify(type="danger", message="Access denied"), 403
+            return f(*args, **kwargs)
+
+        return decorated_function
+
+    return decorator
+
+
+def isoformat(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def parse_date(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def summary_to_dict(summary: RoomSummary) -> dict:
+    return {
+        "id": summary.id,
+        "name": summary.name,
+        "tray_count": summary.tray_count,
+        "planted_date": isoformat(summary.planted_date),
+        "harvest_date": isoformat(summary.harvest_date),
+    }
+
+
+def tray_to_dict(tray: "Tray", include_grid: bool = False) -> dict:
+    data = {
+        "id": tray.id,
+        "room_id": tray.room_id,
+        "name": tray.name,
+        "version": tray.version,
+        "num_of_lights": len(tray.lights),
+        "width": tray.lights[0].width if tray.lights else 0,
+        "height": tray.lights[0].height if tray.lights else 0,
+        "planted_date": isoformat(tray.planted_date),
+        "harvest_date": isoformat(tray.harvest_date),
+    }
+    if include_grid:
+        data["grid"] = tray.grid.to_dict()
+    return data
+
+
+def result(response: Response, data: dict | None = None, status: int = 200):
+    if response.type != "success":
+        status = 404 if response.message.endswith("not found") else 400
+        return jsonify(type=response.type, message=response.message), status
+    return jsonify(type=response.type, message=response.message, data=data), status
+
+
+def tray_form() -> tuple[str, int, int, int]:
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        raise TypeError("expected a JSON object")
+    sizes = {
+        "lights": int(payload.get("num_of_lights", 4)),
+        "width": int(payload.get("width", 3)),
+        "height": int(payload.get("height", 3)),
+    }
+    for field, value in sizes.items():
+        if not 1 <= value <= MAX_TRAY_SIZES[field]:
+            raise ValueError(f"{field} must be between 1 and {MAX_TRAY_SIZES[field]}")
+    return (
+        str(payload.get("name", "")).strip().upper(),
+        sizes["lights"],
+        sizes["width"],
+        sizes["height"],
+    )
+
+
+def room_name() -> str:
+    payload = request.get_json(silent=True) or {}
+    return str(payload.get("name", "")).strip().upper()
+
+
+@api.route("/rooms")
+@login_required
+def list_rooms():
+    summaries = db_manager.get_room_summaries()
+    return jsonify(data=[summary_to_dict(summary) for summary in summaries])
+
+
+@api.route("/rooms", methods=["POST"])
+@login_required
+@api_role_required("superadmin", "admin")
+def create_room():
+    response = db_manager.create_room(room_name())
+    data = {"id": response.id, "name": room_name(), "trays": []}
+    return result(response, data, 201)
+
+
+@api.route("/rooms/<int:room_id>")
+@login_required
+def get_room(room_id: int):
+    room = db_manager.get_room_layout(room_id)
+    if not room:
+        return jsonify(type="danger", message="Room not found"), 404
+
+    include_grids = request.args.get("grids") == "1"
+    if include_grids:
+        db_manager.load_tray_pots(room.trays)
+    trays = [tray_to_dict(tray, include_grids) for tray in room.trays]
+    return jsonify(data={"id": room.id, "name": room.name, "trays": trays})
+
+
+@api.route("/rooms/<int:room_id>", methods=["PATCH"])
+@login_required
+@api_role_required("superadmin", "admin")
+def update_room(room_id: int):
+    response = db_manager.update_room_name(room_id, room_name())
+    return result(response, {"id": room_id, "name": room_name()})
+
+
+@api.route("/rooms/<int:room_id>", methods=["DELETE"])
+@login_required
+@api_role_required("superadmin")
+def delete_room(room_id: int):
+    response = db_manager.delete_room(room_id)
+    return result(response, {"id": room_id})
+
+
+@api.route("/rooms/<int:room_id>/trays", methods=["POST"])
+@login_required
+@api_role_required("superadmin", "admin")
+def add_tray(room_id: int):
+    try:
+        response = db_manager.add_tray_to_room(room_id, *tray_form())
+    except (TypeError, ValueError):
+        return jsonify(type="danger", message="Invalid tray dimensions"), 400
+    if response.type != "success":
+        return result(response)
+
+    tray = cast("Tray", db_manager.get_tray_by_id(cast(int, response.id)))
+    return result(response, tray_to_dict(tray, include_grid=True), 201)
+
+
+@api.route("/rooms/<int:room_id>/strains", methods=["POST"])
+@login_required
+@api_role_required("superadmin", "admin")
+def assign_strain(room_id: int):
+    payload = request.get_json(silent=True) or {}
+    try:
+        if not isinstance(payload, dict):
+            raise TypeError("expected a JSON object")
+        tray_id = payload.get("tray_id")
+        tray_id = int(tray_id) if tray_id is not None else None
+        pot_ids = payload.get("pot_ids")
+        if pot_ids is not None:
+            if not isinstance(pot_ids, list):
+                raise TypeError("pot_ids must be a list")
+            pot_ids = [int(pot_id) for pot_id in pot_ids]
+        # Rows and columns count from 1, as they are shown on the grid.
+        region = payload.get("region")
+        if region is not None:
+            if not isinstance(region, dict):
+                raise TypeError("region must be an object")
+            region = tuple(
+                int(region[field]) - 1
+                for field in ("first_row", "first_col", "last_row", "last_col")
+            )
+        planted_date = parse_date(payload.get("planted_date"))
+        harvest_date = parse_date(payload.get("harvest_date"))
+    except (KeyError, TypeError, ValueError):
+        return jsonify(type="danger", message="Invalid strain assignment"), 400
+
+    response = db_manager.assign_strain(
+        room_id,
+        str(payload.get("strain", "")).strip(),
+        tray_id,
+        pot_ids=pot_ids,
+        region=region,
+        planted_date=planted_date,
+        harvest_date=harvest_date,
+    )
+    if response.type != "success" or tray_id is None:
+        return result(response, {"room_id": room_id})
+
+    tray = cast("Tray", db_manager.get_tray_by_id(tray_id))
+    return result(response, tray_to_dict(tray, include_grid=True))
+
+
+@api.route("/trays/<int:tray_id>")
+@login_required
+def get_tray(tray_id: int):
+    tray = db_manager.get_tray_by_id(tray_id)
+    if not tray:
+        return jsonify(type="danger", message="Tray not found"), 404
+    return jsonify(data=tray_to_dict(tray, include_grid=True))
+
+
+@api.route("/trays/<int:tray_id>/grid")
+@login_required
+def get_tray_grid(tray_id: int):
+    tray = db_manager.get_tray_by_id(tray_id)
+    if not tray:
+        return jsonify(type="danger", message="Tray not found"), 404
+    return jsonify(data=tray.grid.to_dict())
+
+
+@api.route("/trays/<int:tray_id>", methods=["PATCH"])
+@login_required
+@api_role_required("superadmin", "admin")
+def edit_tray(tray_id: int):
+    try:
+        response = db_manager.edit_tray(tray_id, *tray_form())
+    except (TypeError, ValueError):
+        return jsonify(type="danger", message="Invalid tray dimensions"), 400
+    if response.type != "success":
+        return result(response)
+
+    tray = cast("Tray", db_manager.get_tray_by_id(tray_id))
+    return result(response, tray_to_dict(tray, include_grid=True))
+
+
+@api.route("/trays/<int:tray_id>", methods=["DELETE"])
+@login_required
+@api_role_required("superadmin")
+def delete_tray(tray_id: int):
+    response = db_manager.delete_tray(tray_id)
+    return result(response, {"id": tray_id})
@@ -0,0 +1,45 @@
+import mimetypes
+import os
+
+from flask import Blueprint as _Blueprint
+from flask import current_app, request, send_from_directory
+from werkzeug import Response
+
+from website.assets import ENCODINGS, compressed_path, get_asset_manifest
+from website.config import ASSETS
+
+assets = _Blueprint("assets", __name__)
+
+
+@assets.route("/assets/<file_hash>/<path:filename>")
+def asset(file_hash: str, filename: str) -> Response:
+    static_folder = current_app.static_folder or "static"
+    current_hash = get_asset_manifest(current_app).files.get(filename)
+    if current_hash != file_hash:
+        # Stale or unknown fingerprint (e.g. a page rendered before a deploy):
+        # serve the current file, but don't let it be cached as immutable.
+        return send_from_directory(static_folder, filename, max_age=0)
+
+    response = None
+    for encoding, suffix in ENCODINGS.items():
+        if encoding not in request.accept_encodings:
+            continue
+        path = compressed_path(
+            current_app.config["ASSET_BUILD_DIR"], filename, file_hash, suffix
+        )
+        if os.path.exists(path):
+            response = send_from_directory(
+                os.path.dirname(path), os.path.basename(path), max_age=ASSETS["MAX_AGE"]
+            )
+            response.content_encoding = encoding
+            response.mimetype = mimetypes.guess_type(filename)[0] or "text/plain"
+            break
+
+    if response is None:
+        response = send_from_directory(
+            static_folder, filename, max_age=ASSETS["MAX_AGE"]
+        )
+    response.cache_control.immutable = True
+    response.cache_control.public = True
+    response.vary.add("Accept-Encoding")
+    return response
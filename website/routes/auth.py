@@ -4,11 +4,16 @@ from flask import Blueprint as _Blueprint
 from flask import flash, redirect, render_template, request, url_for
 from flask_login import login_required, login_user, logout_user
 from werkzeug import Response
-from werkzeug.security import check_password_hash
 
 from website import db_manager
 from website.config import MIN_LENGTHS
-from website.utils import first_setup_only, login_only_if_configured
+from website.database import BUSY_MESSAGE
+from website.utils import (
+    PasswordHasherBusy,
+    first_setup_only,
+    login_only_if_configured,
+    password_hasher,
+)
 from website.utils import send_password_reset_email as password_reset_email
 
 auth = _Blueprint("auth", __name__)
@@ -53,9 +58,13 @@ def first_setup() -> Response | str:
         elif password != password2:
             flash("Passwords don't match", category="danger")
         else:
-            new_user = db_manager.create_user(
-                name, email, username, password, "superadmin"
-            )
+            try:
+                new_user = db_manager.create_user(
+                    name, email, username, password, "superadmin"
+                )
+            except PasswordHasherBusy:
+                flash(BUSY_MESSAGE, category="warning")
+                return render_template("auth/first_setup.html")
             login_user(new_user, remember=True)
             flash("Registration successful", category="success")
             return redirect(url_for("main.home"))
@@ -75,7 +84,15 @@ def login() -> Response | str:
             user = db_manager.get_user_by_username(email_or_username)
 
         if user:
-            if check_password_hash(user.password, password):
+            try:
+                is_valid = password_hasher.verify(user.password, password)
+            except PasswordHasherBusy:
+                flash(BUSY_MESSAGE, category="warning")
+                return render_template("auth/login.html")
+
+            if is_valid:
+                if password_hasher.needs_rehash(user.password):
+                    db_manager.rehash_password(user, password)
                 login_user(user, remember=True)
                 flash("Login successful", category="success")
                 return redirect(url_for("main.home"))
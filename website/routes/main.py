@@ -1,8 +1,10 @@
 from flask import Blueprint as _Blueprint
-from flask import flash, render_template, request
+from flask import current_app, flash, jsonify, make_response, render_template, request
 from flask_login import current_user, login_required
+from werkzeug import Response
 
 from website import db_manager
+from website.assets import get_asset_manifest
 from website.config import MIN_LENGTHS
 
 main = _Blueprint("main", __name__)
@@ -78,3 +80,25 @@ def settings() -> str:
             else:
                 flash("Theme preference saved successfully", category="success")
     return render_template("main/settings.html")
+
+
+@main.route("/service-worker.js")
+def service_worker() -> Response:
+    response = make_response(
+        render_template("service-worker.js", manifest=get_asset_manifest(current_app))
+    )
+    response.mimetype = "application/javascript"
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@main.route("/asset-manifest.json")
+def asset_manifest() -> Response:
+    response = jsonify(get_asset_manifest(current_app).to_dict())
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@main.route("/offline")
+def offline() -> str:
+    return render_template("main/offline.html")
@@ -1,33 +1,176 @@
+from datetime import datetime
+
 from flask import Blueprint as _Blueprint
-from flask import flash, redirect, render_template, request, url_for
+from flask import (
+    abort,
+    flash,
+    redirect,
+    render_template,
+    request,
+    stream_with_context,
+    url_for,
+)
 from flask_login import login_required
 from werkzeug import Response
 
 from website import db_manager
+from website.events import room_events
+from website.facility import FORMATS, dump_facility, format_for, load_facility
+from website.fragments import (
+    fragment_cache,
+    fragment_response,
+    tray_grid_key,
+    wants_fragment,
+)
+from website.utils import admin_only, conditional_get
 
 room = _Blueprint("room", __name__)
 
+ROOM_MODALS = {"delete": "room/partials/delete_room.html"}
+TRAY_MODALS = {
+    "edit": "room/partials/edit_tray.html",
+    "plant": "room/partials/plant_tray.html",
+    "delete": "room/partials/delete_tray.html",
+}
+
+
+def form_date(field: str) -> datetime | None:
+    try:
+        return datetime.fromisoformat(request.form.get(field, ""))
+    except ValueError:
+        return None
+
+
+def render_room_card(room_id: int) -> str:
+    return render_template(
+        "room/partials/room_card.html",
+        room=db_manager.get_room_summaries([room_id])[0],
+    )
+
+
+def render_tray_card(room_id: int, tray_id: int) -> str:
+    tray = db_manager.get_tray_by_id(tray_id)
+    if not tray or tray.room_id != room_id:
+        abort(404)
+    if tray_grid_key(tray) not in fragment_cache:
+        db_manager.load_tray_pots([tray])
+    return render_template(
+        "room/partials/tray_card.html",
+        room=db_manager.get_room_by_id(room_id),
+        tray=tray,
+    )
+
 
 @room.route("/layouts", methods=["GET", "POST"])
 @login_required
-def layouts() -> str:
-    from website.models import Room
-
+@conditional_get("rooms")
+def layouts() -> Response | str:
     if request.method == "POST":
         name = request.form.get("name", "").strip().upper()
         response = db_manager.create_room(name)
         flash(response.message, response.type)
-    return render_template("room/layouts.html", rooms=Room.query.all())
+        if wants_fragment():
+            if response.id is None:
+                return fragment_response()
+            return fragment_response("append", "rooms", render_room_card(response.id))
+    return render_template("room/layouts.html", rooms=db_manager.get_room_summaries())
+
+
+@room.route("/layouts/import", methods=["POST"])
+@login_required
+@admin_only
+def import_facility() -> Response:
+    upload = request.files.get("file")
+    format = format_for(upload.filename) if upload and upload.filename else None
+    if not format:
+        flash("Choose a .csv or .jsonl file to import", "danger")
+    else:
+        response = load_facility(upload.stream, format)  # type: ignore
+        flash(response.message, response.type)
+    return redirect(url_for("room.layouts"))
+
+
+@room.route("/layouts/export.<any(csv, jsonl):format>")
+@login_required
+@admin_only
+def export_facility(format: str) -> Response:
+    return Response(
+        stream_with_context(dump_facility(format)),
+        mimetype=FORMATS[format],
+        headers={"Content-Disposition": f"attachment; filename=facility.{format}"},
+    )
 
 
 @room.route("/layouts/<int:room_id>", methods=["GET", "POST"])
 @login_required
-def view_room(room_id: int) -> str:
+@conditional_get("room:{room_id}")
+def view_room(room_id: int) -> Response | str:
     if request.method == "POST":
         new_name = request.form.get("name", "").strip().upper()
         response = db_manager.update_room_name(room_id, new_name)
         flash(response.message, response.type)
-    return render_template("room/room.html", room=db_manager.get_room_by_id(room_id))
+        if wants_fragment():
+            if response.id is None:
+                return fragment_response()
+            return fragment_response(
+                "replace",
+                "roomTitle",
+                render_template(
+                    "room/partials/room_title.html",
+                    room=db_manager.get_room_by_id(room_id),
+                ),
+            )
+    room = db_manager.get_room_layout(room_id)
+    if room:
+        db_manager.load_tray_pots(
+            [tray for tray in room.trays if tray_grid_key(tray) not in fragment_cache]
+        )
+    revision = db_manager.get_revisions([f"room:{room_id}"])[f"room:{room_id}"]
+    return render_template("room/room.html", room=room, revision=revision)
+
+
+@room.route("/layouts/<int:room_id>/modals/<any(delete):name>")
+@login_required
+def room_modal(room_id: int, name: str) -> str:
+    room = db_manager.get_room_by_id(room_id)
+    if not room:
+        abort(404)
+    return render_template(ROOM_MODALS[name], room=room)
+
+
+@room.route("/layouts/<int:room_id>/trays/<int:tray_id>")
+@login_required
+def tray_card(room_id: int, tray_id: int) -> str:
+    return render_tray_card(room_id, tray_id)
+
+
+@room.route(
+    "/layouts/<int:room_id>/trays/<int:tray_id>/modals/<any(edit, plant, delete):name>"
+)
+@login_required
+def tray_modal(room_id: int, tray_id: int, name: str) -> str:
+    tray = db_manager.get_tray_by_id(tray_id)
+    if not tray or tray.room_id != room_id:
+        abort(404)
+    return render_template(
+        TRAY_MODALS[name], room=db_manager.get_room_by_id(room_id), tray=tray
+    )
+
+
+@room.route("/layouts/<int:room_id>/events")
+@login_required
+def events(room_id: int) -> Response:
+    name = f"room:{room_id}"
+    subscription = room_events.subscribe(room_id)
+    revision = db_manager.get_revisions([name])[name]
+    last_revision = request.headers.get(
+        "Last-Event-ID", request.args.get("revision", revision, type=int), type=int
+    )
+    return Response(
+        room_events.stream(subscription, last_revision, revision),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @room.route("/layouts/delete/<int:room_id>", methods=["POST"])
@@ -35,6 +178,10 @@ def view_room(room_id: int) -> str:
 def delete_room(room_id: int) -> Response:
     response = db_manager.delete_room(room_id)
     flash(response.message, response.type)
+    if wants_fragment():
+        if response.type != "success":
+            return fragment_response()
+        return fragment_response("remove", f"roomCard{room_id}")
     return redirect(url_for("room.layouts"))
 
 
@@ -50,6 +197,12 @@ def add_tray(room_id: int) -> Response:
             room_id, tray_name, num_of_lights, width, height
         )
         flash(response.message, response.type)
+        if wants_fragment():
+            if response.id is None:
+                return fragment_response()
+            return fragment_response(
+                "append", "trays", render_tray_card(room_id, response.id)
+            )
     return redirect(url_for("room.view_room", room_id=room_id))
 
 
@@ -62,6 +215,12 @@ def edit_tray(room_id: int, tray_id: int) -> Response:
     height = request.form.get("height", 3, type=int)
     response = db_manager.edit_tray(tray_id, tray_name, num_of_lights, width, height)
     flash(response.message, response.type)
+    if wants_fragment():
+        if response.id is None:
+            return fragment_response()
+        return fragment_response(
+            "replace", f"trayCard{tray_id}", render_tray_card(room_id, tray_id)
+        )
     return redirect(url_for("room.view_room", room_id=room_id))
 
 
@@ -70,4 +229,39 @@ def edit_tray(room_id: int, tray_id: int) -> Response:
 def delete_tray(room_id: int, tray_id: int) -> Response:
     response = db_manager.delete_tray(tray_id)
     flash(response.message, response.type)
+    if wants_fragment():
+        if response.type != "success":
+            return fragment_response()
+        return fragment_response("remove", f"trayCard{tray_id}")
+    return redirect(url_for("room.view_room", room_id=room_id))
+
+
+@room.route("/layouts/<int:room_id>/plant_tray/<int:tray_id>", methods=["POST"])
+@login_required
+@admin_only
+def plant_tray(room_id: int, tray_id: int) -> Response:
+    strain_name = request.form.get("strain", "").strip()
+    # The form counts rows and columns from 1, as they are shown on the grid.
+    bounds = [
+        request.form.get(field, type=int)
+        for field in ("first_row", "first_col", "last_row", "last_col")
+    ]
+    region = None
+    if all(bound is not None for bound in bounds):
+        region = tuple(bound - 1 for bound in bounds)  # type: ignore
+    response = db_manager.assign_strain(
+        room_id,
+        strain_name,
+        tray_id,
+        region=region,  # type: ignore
+        planted_date=form_date("planted_date"),
+        harvest_date=form_date("harvest_date"),
+    )
+    flash(response.message, response.type)
+    if wants_fragment():
+        if response.type != "success":
+            return fragment_response()
+        return fragment_response(
+            "replace", f"trayCard{tray_id}", render_tray_card(room_id, tray_id)
+        )
     return redirect(url_for("room.view_room", room_id=room_id))
@@ -0,0 +1,122 @@
+/**
+ * HubSync Fragments
+ * Submits modal forms in the background and patches the page with the
+ * returned fragment, and renders edit/delete modals only when they are opened
+ */
+
+const FRAGMENT_HEADERS = { 'X-Fragment': '1' };
+
+function htmlToElement(html) {
+    const template = document.createElement('template');
+    template.innerHTML = html.trim();
+    return template.content.firstElementChild;
+}
+
+function showAlerts(html) {
+    const alerts = htmlToElement(html);
+    if (!alerts) return;
+
+    document.body.appendChild(alerts);
+    setTimeout(() => {
+        alerts.querySelectorAll('.alert').forEach((alert) => bootstrap.Alert.getOrCreateInstance(alert).close());
+    }, 7500);
+}
+
+/**
+ * Show a danger alert built on the client, laid out like components/alerts.html
+ */
+function showError(message) {
+    const container = htmlToElement(
+        '<div class="position-fixed bottom-0 start-50 translate-middle w-100" style="z-index: 1000;">' +
+        '<div class="alert alert-danger alert-dismissible fade show" role="alert">' +
+        '<div class="text-center text"></div>' +
+        '<button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>' +
+        '</div></div>'
+    );
+    container.querySelector('.text').textContent = message;
+    showAlerts(container.outerHTML);
+}
+
+function applyFragment(fragment) {
+    const target = fragment.target && document.getElementById(fragment.target);
+    if (target) {
+        if (fragment.action === 'replace') {
+            target.replaceWith(htmlToElement(fragment.html));
+        } else if (fragment.action === 'remove') {
+            target.remove();
+        } else if (fragment.action === 'append' && !document.getElementById(htmlToElement(fragment.html).id)) {
+            // Live room updates may already have added it
+            target.querySelectorAll(':scope > [data-empty]').forEach((empty) => empty.remove());
+            target.appendChild(htmlToElement(fragment.html));
+        }
+    }
+    showAlerts(fragment.alerts);
+}
+
+// Forms marked with data-fragment post in the background instead of
+// redirecting to a full page render
+document.addEventListener('submit', async function (event) {
+    const form = event.target;
+    if (!form.matches('form[data-fragment]')) return;
+    event.preventDefault();
+
+    if (!navigator.onLine) {
+        // Nothing was sent, so a regular submission (which does not fire this
+        // handler) cannot apply the change twice
+        form.submit();
+        return;
+    }
+
+    // From here on the server may already have applied the change, even when
+    // the connection drops or it answers with an error, so never resubmit
+    let response;
+    try {
+        response = await fetch(form.action, {
+            method: 'POST',
+            body: new FormData(form),
+            headers: FRAGMENT_HEADERS,
+        });
+    } catch (error) {
+        showError('Could not reach the server. Reload the page to check whether the change was saved.');
+        return;
+    }
+
+    let fragment = null;
+    if ((response.headers.get('Content-Type') || '').includes('application/json')) {
+        fragment = await response.json().catch(() => null);
+    }
+    if (!response.ok || !fragment) {
+        if (fragment && fragment.alerts) {
+            showAlerts(fragment.alerts);
+        } else {
+            showError('Something went wrong. Reload the page to check whether the change was saved.');
+        }
+        return;
+    }
+
+    const modal = form.closest('.modal');
+    if (modal) bootstrap.Modal.getOrCreateInstance(modal).hide();
+    if (fragment.action) form.reset();
+    applyFragment(fragment);
+});
+
+// Buttons with data-modal-url load their modal on click and discard it once
+// closed, so a page renders one button per item instead of one modal
+document.addEventListener('click', async function (event) {
+    const trigger = event.target.closest('[data-modal-url]');
+    if (!trigger || trigger.dataset.loading) return;
+    event.preventDefault();
+
+    trigger.dataset.loading = 'true';
+    try {
+        const response = await fetch(trigger.dataset.modalUrl, { headers: FRAGMENT_HEADERS });
+        if (!response.ok) return;
+
+        const modal = htmlToElement(await response.text());
+        document.body.appendChild(modal);
+        modal.addEventListener('hidden.bs.modal', () => modal.remove(), { once: true });
+        bootstrap.Modal.getOrCreateInstance(modal).show();
+    } finally {
+        delete trigger.dataset.loading;
+    }
+});
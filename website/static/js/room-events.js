@@ -0,0 +1,95 @@
+/**
+ * HubSync Room Events
+ * Keeps an open room page up to date from the server's event stream,
+ * replacing only the tray cards that changed
+ */
+
+class RoomEvents {
+    constructor(container) {
+        this.container = container;
+        this.trayUrl = container.dataset.trayUrl;
+        this.layoutsUrl = container.dataset.layoutsUrl;
+        this.source = new EventSource(container.dataset.roomEvents);
+
+        this.source.addEventListener('tray_added', (e) => this.refreshTray(JSON.parse(e.data).tray_id));
+        this.source.addEventListener('tray_updated', (e) => this.refreshTray(JSON.parse(e.data).tray_id));
+        this.source.addEventListener('tray_deleted', (e) => this.removeTray(JSON.parse(e.data).tray_id));
+        this.source.addEventListener('room_updated', () => this.resync());
+        this.source.addEventListener('room_deleted', () => window.location.assign(this.layoutsUrl));
+        this.source.addEventListener('resync', () => this.resync());
+
+        window.addEventListener('pagehide', () => this.source.close());
+    }
+
+    /**
+     * Run the callback once no modal is open, so a card is never swapped out
+     * while the user is editing it
+     */
+    whenIdle(callback) {
+        const modal = document.querySelector('.modal.show');
+        if (modal) {
+            modal.addEventListener('hidden.bs.modal', callback, { once: true });
+        } else {
+            callback();
+        }
+    }
+
+    async refreshTray(trayId) {
+        const response = await fetch(this.trayUrl.replace(/0$/, trayId));
+        if (response.status === 404) return this.removeTray(trayId);
+        if (!response.ok) return;
+
+        const template = document.createElement('template');
+        template.innerHTML = (await response.text()).trim();
+        const card = template.content.firstElementChild;
+
+        this.whenIdle(() => {
+            const existing = document.getElementById(`trayCard${trayId}`);
+            if (existing) {
+                // Keep the details panel open if the user had expanded it
+                const details = existing.querySelector(`#trayDetails${trayId}`);
+                if (details && details.classList.contains('show')) {
+                    card.querySelector(`#trayDetails${trayId}`).classList.add('show');
+                }
+                existing.replaceWith(card);
+            } else {
+                const placeholder = document.getElementById('noTrays');
+                if (placeholder) placeholder.remove();
+                this.container.appendChild(card);
+            }
+        });
+    }
+
+    removeTray(trayId) {
+        this.whenIdle(() => {
+            const existing = document.getElementById(`trayCard${trayId}`);
+            if (existing) existing.remove();
+            if (!this.container.querySelector('[data-tray-id]')) this.resync();
+        });
+    }
+
+    /**
+     * Re-fetch the whole page and swap the room title and tray list, used when
+     * events may have been missed or the room itself changed
+     */
+    async resync() {
+        const response = await fetch(window.location.href, { cache: 'no-cache' });
+        if (!response.ok) return;
+
+        const page = new DOMParser().parseFromString(await response.text(), 'text/html');
+        ['roomTitle', 'trays'].forEach((id) => {
+            const fresh = page.getElementById(id);
+            const current = document.getElementById(id);
+            if (fresh && current) current.innerHTML = fresh.innerHTML;
+        });
+    }
+}
+
+// Auto-initialize for pages with data-room-events attribute
+document.addEventListener('DOMContentLoaded', function () {
+    if (!window.EventSource) return;
+
+    document.querySelectorAll('[data-room-events]').forEach(container => {
+        container._roomEvents = new RoomEvents(container);
+    });
+});
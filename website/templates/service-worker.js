@@ -0,0 +1,89 @@
+const VERSION = {{ manifest.version|tojson }};
+const STATIC_URL = {{ url_for('static', filename='')|tojson }};
+const ASSET_URL = {{ url_for('assets.asset', file_hash='HASH', filename='FILE')|tojson }};
+const ASSET_PREFIX = ASSET_URL.slice(0, ASSET_URL.indexOf("HASH"));
+const FILES = {{ manifest.files|tojson }};
+const PRECACHE = {{ manifest.precache|tojson }};
+const OFFLINE_URL = {{ url_for('main.offline')|tojson }};
+const LOGOUT_URL = {{ url_for('auth.logout')|tojson }};
+
+const CACHE_PREFIX = "hubsync-";
+const STATIC_CACHE = `${CACHE_PREFIX}static-${VERSION}`;
+const PAGES_CACHE = `${CACHE_PREFIX}pages`;
+
+// Static files are cached under their fingerprinted /assets URL, so an
+// unchanged file found in a previous version's cache is copied instead of
+// downloaded again.
+const versionedUrl = (filename) => ASSET_URL.replace("HASH", FILES[filename]).replace("FILE", filename);
+
+async function precache() {
+    const cache = await caches.open(STATIC_CACHE);
+    await Promise.all(PRECACHE.map(async (filename) => {
+        const url = versionedUrl(filename);
+        const cached = await caches.match(url);
+        await (cached ? cache.put(url, cached) : cache.add(url));
+    }));
+    await cache.add(OFFLINE_URL);
+}
+
+async function cleanup() {
+    const names = await caches.keys();
+    await Promise.all(names
+        .filter((name) => name.startsWith(CACHE_PREFIX) && name !== STATIC_CACHE && name !== PAGES_CACHE)
+        .map((name) => caches.delete(name)));
+}
+
+async function cacheFirst(request, filename) {
+    const key = filename && filename in FILES ? versionedUrl(filename) : request;
+    const cached = await caches.match(key);
+    if (cached) return cached;
+
+    const response = await fetch(request);
+    if (response.ok) {
+        const cache = await caches.open(STATIC_CACHE);
+        await cache.put(key, response.clone());
+    }
+    return response;
+}
+
+// Pages come from the network whenever it answers, so flashed alerts and
+// fresh data are never replayed from the cache; the last copy of each page
+// is kept for offline use, except for responses marked no-store.
+async function networkFirst(event) {
+    const cache = await caches.open(PAGES_CACHE);
+    try {
+        const response = await fetch(event.request);
+        const noStore = (response.headers.get("Cache-Control") || "").includes("no-store");
+        if (response.ok && !response.redirected && response.type === "basic" && !noStore) {
+            event.waitUntil(cache.put(event.request, response.clone()));
+        }
+        return response;
+    } catch (error) {
+        return (await cache.match(event.request)) || (await caches.match(OFFLINE_URL));
+    }
+}
+
+self.addEventListener("install", (event) => {
+    event.waitUntil(precache().then(() => self.skipWaiting()));
+});
+
+self.addEventListener("activate", (event) => {
+    event.waitUntil(cleanup().then(() => self.clients.claim()));
+});
+
+self.addEventListener("fetch", (event) => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (request.method !== "GET" || url.origin !== self.location.origin) return;
+
+    if (url.pathname.startsWith(ASSET_PREFIX)) {
+        event.respondWith(cacheFirst(request, null));
+    } else if (url.pathname.startsWith(STATIC_URL)) {
+        const filename = url.pathname.slice(STATIC_URL.length);
+        event.respondWith(cacheFirst(request, filename));
+    } else if (url.pathname === LOGOUT_URL) {
+        event.respondWith(caches.delete(PAGES_CACHE).then(() => fetch(request)));
+    } else if (request.mode === "navigate") {
+        event.respondWith(networkFirst(event));
+    }
+});
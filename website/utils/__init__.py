@@ -1,9 +1,12 @@
+from .cache import TTLCache
 from .datatype import Role
 from .decorators import (
     admin_only,
+    conditional_get,
     first_setup_only,
     login_only_if_configured,
     superadmin_only,
 )
-from .helpers import send_password_reset_email
+from .hashing import PasswordHasherBusy, password_hasher
+from .helpers import send_password_reset_email, templates_fingerprint, write_atomic
 from .helpers import send_password_reset_email
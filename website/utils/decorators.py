@@ -1,6 +1,8 @@
+import hashlib
+from datetime import date
 from functools import wraps
 
-from flask import flash, redirect, request, url_for
+from flask import current_app, flash, make_response, redirect, request, session, url_for
 from flask_login import current_user
 from werkzeug import Response
 
@@ -51,3 +53,42 @@ def admin_only(f):
         return f(*args, **kwargs)
 
     return decorated_function
+
+
+def conditional_get(*revisions: str):
+    """Answer ``If-None-Match`` with a 304 while the named revisions are unchanged.
+
+    Revision names may use the view arguments as format fields, such as
+    ``"room:{room_id}"``. The users revision and the current user are always
+    part of the ETag, because every page renders the navbar for that user, and
+    so is today's date, because pages show days since planting and to harvest.
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs) -> Response | str:
+            from website import db_manager
+
+            if request.method != "GET" or session.get("_flashes"):
+                return f(*args, **kwargs)
+
+            names = [name.format(**kwargs) for name in revisions] + ["users"]
+            state = (
+                sorted(db_manager.get_revisions(names).items()),
+                current_user.get_id(),
+                current_app.config.get("ETAG_SALT"),
+                date.today().isoformat(),
+            )
+            etag = hashlib.sha1(repr(state).encode()).hexdigest()
+
+            if request.if_none_match.contains(etag):
+                response = make_response("", 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+        return decorated_function
+
+    return decorator
@@ -0,0 +1,68 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from threading import BoundedSemaphore
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from website.config import PASSWORD_HASH
+from website.metrics import metrics
+
+
+class PasswordHasherBusy(RuntimeError):
+    pass
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        method: str = "scrypt",
+        salt_length: int = 16,
+        workers: int = 2,
+        max_queue: int = 16,
+        timeout: float = 10,
+    ) -> None:
+        self.method = method
+        self.salt_length = salt_length
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="hasher")
+        self._slots = BoundedSemaphore(workers + max_queue)
+
+    @cached_property
+    def method_prefix(self) -> str:
+        return self._hash("").split("$", 1)[0]
+
+    def hash(self, password: str) -> str:
+        return self._submit("hash", self._hash, password)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return self._submit("verify", check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        return pwhash.split("$", 1)[0] != self.method_prefix
+
+    def _hash(self, password: str) -> str:
+        return generate_password_hash(password, self.method, self.salt_length)
+
+    def _submit(self, operation: str, fn, *args):
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordHasherBusy("Too many password operations in progress")
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+            metrics.observe(
+                "hubsync_password_hash_seconds",
+                {"operation": operation},
+                time.perf_counter() - started,
+            )
+
+
+password_hasher = PasswordHasher(
+    method=PASSWORD_HASH["METHOD"],
+    salt_length=PASSWORD_HASH["SALT_LENGTH"],
+    workers=PASSWORD_HASH["WORKERS"],
+    max_queue=PASSWORD_HASH["MAX_QUEUE"],
+    timeout=PASSWORD_HASH["TIMEOUT"],
+)
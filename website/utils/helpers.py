@@ -1,12 +1,42 @@
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+import hashlib
+import os
+import tempfile
 
-from website.config import MAIL_CONFIG
+from flask import Flask, current_app
+
+
+def templates_fingerprint(app: Flask) -> str:
+    template_dir = os.path.join(app.root_path, app.template_folder or "templates")
+    digest = hashlib.sha1()
+    for root, _, files in sorted(os.walk(template_dir)):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(f"{path}:{os.path.getmtime(path)}".encode())
+    return digest.hexdigest()[:12]
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write ``data`` to ``path`` so that readers see the old or the new file.
+
+    Every worker writes generated files at startup while others may already
+    be serving them, so the data goes to a temporary file in the same
+    directory that is then renamed over ``path``.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 
 def send_password_reset_email(email: str) -> None:
-    from website import db_manager
+    from website import db_manager, mail_dispatcher
 
     try:
         user = db_manager.get_user_by_email(email)
@@ -42,15 +72,6 @@ def send_password_reset_email(email: str) -> None:
         </html>
         """
         text = f"Click this link to reset your password: {reset_link}"
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = "Password Reset"
-        msg["From"] = MAIL_CONFIG["AUTHOR"] + " <" + MAIL_CONFIG["SENDER"] + ">"
-        msg["To"] = email
-        msg.attach(MIMEText(text, "plain"))
-        msg.attach(MIMEText(html, "html"))
-
-        with smtplib.SMTP_SSL(MAIL_CONFIG["SERVER"], MAIL_CONFIG["PORT"]) as server:
-            server.login(MAIL_CONFIG["USERNAME"], MAIL_CONFIG["PASSWORD"])
-            server.sendmail(MAIL_CONFIG["USERNAME"], [email], msg.as_string())
-    except Exception as e:
-        print(f"Failed to send email: {e}")
+        mail_dispatcher.enqueue(email, "Password Reset", text, html)
+    except Exception:
+        current_app.logger.exception("Failed to queue email")